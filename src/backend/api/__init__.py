@@ -17,7 +17,7 @@ from .users import users_bp # src/backend/api/users.py
 from .chat import chat_bp # src/backend/api/chat.py
 from .suggestions import suggestions_bp # src/backend/api/suggestions.py
 from .templates import templates_bp # src/backend/api/templates.py
-from ..core.auth.jwt_service import JWTService # src/backend/core/auth/jwt_service.py
+from ..core.auth.jwt_service import JWTService, VALIDATION_CACHE_SIZE # src/backend/core/auth/jwt_service.py
 from ..core.auth.anonymous_session import AnonymousSessionManager # src/backend/core/auth/anonymous_session.py
 from ..core.auth.user_service import UserService # src/backend/core/auth/user_service.py
 from ..core.utils.logger import get_logger # src/backend/core/utils/logger.py
@@ -98,8 +98,10 @@ def init_services(config: dict) -> tuple:
     jwt_algorithm = config.get("JWT_ALGORITHM")
     jwt_access_token_expires = config.get("JWT_ACCESS_TOKEN_EXPIRES")
     jwt_refresh_token_expires = config.get("JWT_REFRESH_TOKEN_EXPIRES")
+    jwt_validation_cache_size = config.get("JWT_VALIDATION_CACHE_SIZE", VALIDATION_CACHE_SIZE)
     global _jwt_service
-    _jwt_service = JWTService(jwt_secret_key, jwt_algorithm, jwt_access_token_expires, jwt_refresh_token_expires)
+    _jwt_service = JWTService(jwt_secret_key, jwt_algorithm, jwt_access_token_expires, jwt_refresh_token_expires,
+                              validation_cache_size=jwt_validation_cache_size)
 
     # Initialize AnonymousSessionManager for session handling
     global _anonymous_session_manager
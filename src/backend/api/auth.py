@@ -278,18 +278,20 @@ def logout():
         if request.is_json and 'refresh_token' in request.json:
             refresh_token = request.json['refresh_token']
         
-        # Extract token ID from token claims if available
+        # Extract token ID and expiry from token claims if available
         token_id = None
+        expires_at = None
         if refresh_token:
             validation = _jwt_service.validate_token(refresh_token, "refresh")
             if validation["is_valid"]:
                 token_id = validation["payload"].get("jti")
+                expires_at = validation["payload"].get("exp")
         
         # Determine if logging out from all devices (query parameter)
         all_devices = request.args.get('all', 'false').lower() == 'true'
         
         # Call user_service.logout_user with appropriate parameters
-        _user_service.logout_user(user_id, token_id, all_devices)
+        _user_service.logout_user(user_id, token_id, all_devices, expires_at=expires_at)
         
         # Log successful logout with user ID
         logger.info("User logged out successfully", user_id=user_id, all_devices=all_devices)
@@ -246,7 +246,9 @@ class AuthResource(Resource):
             # Invalidate old refresh token (rotation)
             token_id = validation_result['payload'].get('jti')
             if token_id:
-                self.jwt_service.invalidate_tokens(user_id, [token_id])
+                self.jwt_service.invalidate_tokens(
+                    user_id, [token_id], expires_at=validation_result['payload'].get('exp')
+                )
             
             # Generate new tokens
             new_tokens = self.jwt_service.generate_tokens(user_id)
@@ -41,6 +41,8 @@ class Config:
         self.JWT_ALGORITHM = 'HS256'
         self.JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1).total_seconds()
         self.JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=7).total_seconds()
+        # Verified JWT payloads kept in memory until their expiry; 0 disables the cache
+        self.JWT_VALIDATION_CACHE_SIZE = int(os.environ.get('JWT_VALIDATION_CACHE_SIZE', 4096))
         
         # OpenAI API configurations
         self.OPENAI_API_KEY = OPENAI_API_KEY
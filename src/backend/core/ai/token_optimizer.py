@@ -4,17 +4,23 @@ efficient token counting, context windowing, and prompt optimization strategies
 token limits and reduce API costs.
 """
 
+import bisect
 import json
 import hashlib
+import heapq
+import math
 import re
+import string
+import threading
 import time
+from itertools import accumulate
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import tiktoken  # tiktoken ~=0.5.1
 
 from ...core.utils.logger import get_logger
 from ...config import AI_CONFIG 
-from ...data.redis.caching_service import cache_set, cache_get, get_content_hash_key
+from ...data.redis.caching_service import cache_set, cache_get
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -29,6 +35,210 @@ CACHE_TTL = AI_CONFIG.get('token_optimizer_cache_ttl', 3600)  # 1 hour default
 CACHE_PREFIX = 'token_optimizer:'
 DEFAULT_SIMILARITY_THRESHOLD = 0.8
 
+# Encodings resolved per model name, shared by all TokenOptimizer instances
+_MODEL_ENCODINGS: Dict[str, tiktoken.Encoding] = {}
+_MODEL_ENCODINGS_LOCK = threading.Lock()
+
+# Precompiled patterns used when splitting and trimming text
+_SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?])\s+')
+_CHUNK_HEAD_PATTERN = re.compile(r'^[^\n]*?[.!?]\s+')
+_CHUNK_TAIL_PATTERN = re.compile(r'[.!?]\s+[^\n]*$')
+_TEMPLATE_VARIABLE_PATTERN = re.compile(r'\{(\w+)\}')
+
+# Terms that mark a sentence as important when extracting key sentences
+_KEY_TERMS = ("key", "important", "significant", "main", "critical", "crucial")
+_KEY_TERMS_PATTERN = re.compile("|".join(map(re.escape, _KEY_TERMS)))
+
+# Weights used to combine key sentence scores
+_POSITION_WEIGHT = 0.3
+_LENGTH_WEIGHT = 0.1
+_CONTENT_WEIGHT = 0.2
+_RELEVANCE_WEIGHT = 0.4
+
+# Translation table that strips ASCII punctuation (underscore is a word character)
+_PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation.replace('_', ''))
+
+
+def _normalize_text(text: str) -> str:
+    """
+    Normalizes text for similarity comparison: lowercases, strips punctuation
+    and collapses whitespace.
+    
+    Args:
+        text: Text to normalize
+        
+    Returns:
+        Normalized text
+    """
+    return ' '.join(text.lower().translate(_PUNCTUATION_TABLE).split())
+
+
+def _find_chunk_head_end(chunk: str) -> int:
+    """
+    Finds the end of the partial sentence at the start of a chunk.
+    
+    Equivalent to _CHUNK_HEAD_PATTERN.search(chunk).end(), but uses str.find
+    to locate the first sentence terminator on the first line instead of a
+    backtracking regex.
+    
+    Args:
+        chunk: Decoded chunk text
+        
+    Returns:
+        Index just past the terminator and its trailing whitespace, or -1
+    """
+    search_end = chunk.find('\n')
+    if search_end == -1:
+        search_end = len(chunk)
+        
+    terminator = -1
+    for char in '.!?':
+        index = chunk.find(char, 0, search_end)
+        # A terminator only counts when followed by whitespace
+        while index != -1 and not chunk[index + 1:index + 2].isspace():
+            index = chunk.find(char, index + 1, search_end)
+        if index != -1:
+            terminator = index
+            search_end = index
+            
+    if terminator == -1:
+        return -1
+        
+    end = terminator + 1
+    while end < len(chunk) and chunk[end].isspace():
+        end += 1
+    return end
+
+
+def _find_chunk_tail_end(chunk: str) -> int:
+    """
+    Finds the end of _CHUNK_TAIL_PATTERN's match in a chunk.
+    
+    The pattern cannot match across the last line break unless the break is
+    part of the whitespace after a terminator, so the search starts just
+    before that whitespace run (found with str.rfind) instead of scanning the
+    whole chunk.
+    
+    Args:
+        chunk: Decoded chunk text
+        
+    Returns:
+        End index of the match, or -1 if there is none
+    """
+    body_end = len(chunk) - 1 if chunk.endswith('\n') else len(chunk)
+    search_start = chunk.rfind('\n', 0, body_end)
+    if search_start == -1:
+        search_start = 0
+    else:
+        while search_start > 0 and chunk[search_start - 1].isspace():
+            search_start -= 1
+        search_start = max(search_start - 1, 0)
+        
+    match = _CHUNK_TAIL_PATTERN.search(chunk, search_start)
+    return match.end() if match else -1
+
+
+def _chunk_boundaries(token_count: int, chunk_size: int, overlap: int) -> List[Tuple[int, int]]:
+    """
+    Calculates overlapping chunk boundaries over a token sequence.
+    
+    Windows start every (chunk_size - overlap) tokens until one reaches the
+    end of the document.
+    
+    Args:
+        token_count: Number of tokens in the document
+        chunk_size: Maximum tokens per chunk
+        overlap: Number of tokens to overlap between chunks
+        
+    Returns:
+        List of (start, end) token offsets
+        
+    Raises:
+        ValueError: If overlap is not smaller than chunk_size
+    """
+    step = chunk_size - overlap
+    if step <= 0:
+        raise ValueError("Chunk overlap must be smaller than chunk size")
+        
+    last_start = -(-max(token_count - chunk_size, 0) // step) * step
+    return [
+        (start, min(start + chunk_size, token_count))
+        for start in range(0, last_start + 1, step)
+    ]
+
+
+def _trim_chunk(chunk: str, start: int, end: int, token_count: int) -> str:
+    """
+    Trims a decoded chunk so its boundaries maintain semantic integrity.
+    
+    Args:
+        chunk: Decoded chunk text
+        start: Start token offset of the chunk
+        end: End token offset of the chunk
+        token_count: Number of tokens in the document
+        
+    Returns:
+        Trimmed chunk text
+    """
+    if start > 0:
+        # Try to start at a sentence or paragraph boundary
+        head_end = _find_chunk_head_end(chunk)
+        if head_end != -1:
+            # Remove partial sentence at beginning
+            chunk = chunk[head_end:]
+            
+    if end < token_count:
+        # Try to end at a sentence boundary
+        tail_end = _find_chunk_tail_end(chunk)
+        if tail_end != -1:
+            # Keep the sentence boundary
+            chunk = chunk[:tail_end]
+            
+    return chunk
+
+
+def _position_scores(sentence_count: int) -> List[float]:
+    """
+    Scores every sentence position in a text at once.
+    
+    The score only depends on which band an index falls into, so the list is
+    built from repeated runs instead of evaluating each index separately.
+    
+    Args:
+        sentence_count: Total number of sentences
+        
+    Returns:
+        Position-based importance score for each sentence index
+    """
+    first_third_end = -(-sentence_count // 3)  # indices < sentence_count / 3
+    middle_third_end = -(-2 * sentence_count // 3)  # indices < sentence_count * 2 / 3
+    
+    scores = (
+        [0.6] * first_third_end  # First third
+        + [0.4] * (middle_third_end - first_third_end)  # Middle third
+        + [0.3] * (sentence_count - middle_third_end)  # Last third
+    )
+    scores[-1] = 0.8  # Last sentence
+    scores[0] = 1.0  # First sentence
+    return scores
+
+
+def _length_score(token_count: int) -> float:
+    """
+    Scores a sentence by its length, preferring medium-length sentences.
+    
+    Args:
+        token_count: Number of tokens in the sentence
+        
+    Returns:
+        Length-based score
+    """
+    if token_count < 5:
+        return 0.3  # Too short
+    if token_count > 30:
+        return 0.5  # Too long
+    return 1.0  # Just right
+
 
 def count_tokens(text: str, encoding_name: str = DEFAULT_ENCODING) -> int:
     """
@@ -120,17 +330,8 @@ def calculate_similarity(text1: str, text2: str) -> float:
         return 0.0
         
     # Normalize texts
-    def normalize(text):
-        # Convert to lowercase
-        text = text.lower()
-        # Remove punctuation
-        text = re.sub(r'[^\w\s]', '', text)
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
-        
-    text1 = normalize(text1)
-    text2 = normalize(text2)
+    text1 = _normalize_text(text1)
+    text2 = _normalize_text(text2)
     
     # If either normalized text is empty, return 0
     if not text1 or not text2:
@@ -150,27 +351,42 @@ def calculate_similarity(text1: str, text2: str) -> float:
     return len(intersection) / len(union)
 
 
-def get_encoding_for_model(model_name: str = DEFAULT_MODEL):
+def get_encoding_for_model(model_name: str = DEFAULT_MODEL) -> tiktoken.Encoding:
     """
     Gets the appropriate tiktoken encoding for a specific model.
     
+    Encodings are resolved once per model name and reused afterwards, so
+    constructing TokenOptimizer instances per request stays cheap.
+    
     Args:
         model_name: Name of the model
         
     Returns:
         Tiktoken encoding appropriate for the specified model
     """
-    try:
-        # For newer models like GPT-4 and GPT-3.5
-        if "gpt-4" in model_name or "gpt-3.5" in model_name:
-            return tiktoken.encoding_for_model(model_name)
-        # For older models or fallback
-        else:
-            return tiktoken.get_encoding(DEFAULT_ENCODING)
-    except Exception as e:
-        logger.error(f"Error getting encoding for model {model_name}: {str(e)}")
-        # Fallback to default encoding
-        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    encoding = _MODEL_ENCODINGS.get(model_name)
+    if encoding is not None:
+        return encoding
+        
+    with _MODEL_ENCODINGS_LOCK:
+        encoding = _MODEL_ENCODINGS.get(model_name)
+        if encoding is not None:
+            return encoding
+            
+        try:
+            # For newer models like GPT-4 and GPT-3.5
+            if "gpt-4" in model_name or "gpt-3.5" in model_name:
+                encoding = tiktoken.encoding_for_model(model_name)
+            # For older models or fallback
+            else:
+                encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+        except Exception as e:
+            logger.error(f"Error getting encoding for model {model_name}: {str(e)}")
+            # Fallback to default encoding
+            encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+            
+        _MODEL_ENCODINGS[model_name] = encoding
+        return encoding
         
 
 def generate_cache_key(model: str, content: str, params: Dict = None) -> str:
@@ -185,12 +401,152 @@ def generate_cache_key(model: str, content: str, params: Dict = None) -> str:
     Returns:
         Cache key for storing/retrieving optimization results
     """
-    # Generate a hash of the inputs
+    # Hash the inputs incrementally to avoid building a concatenated copy of the content
     params_str = json.dumps(params or {}, sort_keys=True)
-    hash_input = f"{model}:{content}:{params_str}"
-    content_hash = get_content_hash_key(hash_input)
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(model.encode('utf-8', 'ignore'))
+    hasher.update(b':')
+    hasher.update(content.encode('utf-8', 'ignore'))
+    hasher.update(b':')
+    hasher.update(params_str.encode('utf-8', 'ignore'))
+    
+    return f"{CACHE_PREFIX}{hasher.hexdigest()}"
+
+
+def _token_set(text: str) -> set:
+    """
+    Builds the set of normalized word tokens in a text.
+    
+    Args:
+        text: Text to tokenize
+        
+    Returns:
+        Set of normalized tokens
+    """
+    return set(_normalize_text(text).split())
+
+
+def _request_token_set(request: Dict) -> set:
+    """
+    Builds the normalized token set used to compare requests for similarity.
+    
+    Args:
+        request: Request with optional prompt, query and content fields
+        
+    Returns:
+        Set of normalized tokens
+    """
+    text = f"{request.get('prompt', '')} {request.get('query', '')} {request.get('content', '')[:500]}"
+    return _token_set(text)
+
+
+def _jaccard_similarity(tokens1: set, tokens2: set) -> float:
+    """
+    Calculates the Jaccard similarity between two token sets.
     
-    return f"{CACHE_PREFIX}{content_hash}"
+    Args:
+        tokens1: First token set
+        tokens2: Second token set
+        
+    Returns:
+        Similarity score between 0 and 1
+    """
+    if not tokens1 or not tokens2:
+        return 0.0
+        
+    intersection = len(tokens1 & tokens2)
+    return intersection / (len(tokens1) + len(tokens2) - intersection)
+
+
+def _is_similar(tokens1: set, tokens2: set, threshold: float) -> bool:
+    """
+    Checks whether two token sets reach a Jaccard similarity threshold.
+    
+    Jaccard similarity can never exceed the ratio of the smaller set size to
+    the larger one, so pairs failing that bound skip the set intersection.
+    
+    Args:
+        tokens1: First token set
+        tokens2: Second token set
+        threshold: Minimum similarity
+        
+    Returns:
+        True if the similarity is at least the threshold
+    """
+    smaller, larger = sorted((len(tokens1), len(tokens2)))
+    if larger and smaller / larger < threshold:
+        return False
+        
+    return _jaccard_similarity(tokens1, tokens2) >= threshold
+
+
+class _SimilarityIndex:
+    """
+    Inverted index over token-set prefixes for finding similar requests.
+    
+    Uses prefix filtering: with tokens in a fixed order, two sets whose Jaccard
+    similarity reaches the threshold must share a token within the first
+    len(tokens) - ceil(threshold * len(tokens)) + 1 tokens of each set. Only
+    entries sharing a prefix token are compared, so results match a full scan.
+    """
+    
+    def __init__(self, threshold: float):
+        """
+        Initializes an empty index for the given similarity threshold.
+        
+        Args:
+            threshold: Minimum Jaccard similarity for a match
+        """
+        self._threshold = threshold
+        self._token_sets: List[set] = []
+        self._prefix_index: Dict[str, List[int]] = {}
+        
+    def _prefix(self, tokens: set) -> List[str]:
+        """
+        Returns the prefix tokens that must overlap for a possible match.
+        """
+        # Small epsilon keeps float rounding from shrinking the prefix
+        prefix_length = len(tokens) - math.ceil(self._threshold * len(tokens) - 1e-9) + 1
+        return sorted(tokens)[:prefix_length] if prefix_length > 0 else []
+        
+    def add(self, tokens: set) -> None:
+        """
+        Adds a token set to the index at the next position.
+        
+        Args:
+            tokens: Token set to index
+        """
+        position = len(self._token_sets)
+        self._token_sets.append(tokens)
+        for token in self._prefix(tokens):
+            self._prefix_index.setdefault(token, []).append(position)
+            
+    def find(self, tokens: set) -> int:
+        """
+        Finds the first indexed token set similar to the given one.
+        
+        Args:
+            tokens: Token set to look up
+            
+        Returns:
+            Position of the first similar entry, or -1 if none
+        """
+        if not self._token_sets:
+            return -1
+            
+        # Every pair is similar when the threshold is not positive
+        if self._threshold <= 0:
+            return 0
+            
+        candidates = set()
+        for token in self._prefix(tokens):
+            candidates.update(self._prefix_index.get(token, ()))
+            
+        for position in sorted(candidates):
+            if _is_similar(tokens, self._token_sets[position], self._threshold):
+                return position
+                
+        return -1
 
 
 class TokenOptimizer:
@@ -212,6 +568,9 @@ class TokenOptimizer:
         self._model = model
         self._max_tokens = max_tokens
         self._encoding = get_encoding_for_model(model)
+        # Bound once so count_tokens avoids the attribute lookups on every call.
+        # encode_ordinary skips the per-call special-token scan done by encode.
+        self._encode = self._encoding.encode_ordinary
         self._use_cache = use_cache
         self.logger = get_logger(__name__)
         
@@ -229,12 +588,32 @@ class TokenOptimizer:
             return 0
             
         try:
-            return len(self._encoding.encode(text))
+            return len(self._encode(text))
         except Exception as e:
             self.logger.error(f"Error counting tokens: {str(e)}")
             # Fallback to rough estimation
             return len(text) // 4
             
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """
+        Counts tokens for several texts with a single batched encoding call.
+        
+        Args:
+            texts: Texts to count tokens for
+            
+        Returns:
+            Token counts in the same order as the input texts
+        """
+        if not texts:
+            return []
+            
+        try:
+            return [len(tokens) for tokens in self._encoding.encode_ordinary_batch(texts)]
+        except Exception as e:
+            self.logger.error(f"Error counting tokens: {str(e)}")
+            # Fallback to rough estimation
+            return [len(text) // 4 for text in texts]
+            
     def optimize_prompt(self, prompt: str, content: str, 
                        max_tokens: int = None, 
                        reserved_tokens: int = 0) -> str:
@@ -253,18 +632,6 @@ class TokenOptimizer:
         if max_tokens is None:
             max_tokens = self._max_tokens
             
-        # Check if result is already cached
-        if self._use_cache:
-            cache_key = generate_cache_key(
-                self._model, 
-                content, 
-                {"prompt": prompt, "max_tokens": max_tokens, "reserved": reserved_tokens}
-            )
-            cached_result = cache_get(cache_key)
-            if cached_result:
-                self.logger.debug("Using cached optimized prompt")
-                return cached_result
-                
         # Count tokens in prompt
         prompt_tokens = self.count_tokens(prompt)
         
@@ -278,6 +645,21 @@ class TokenOptimizer:
         # Optimize content to fit available tokens
         content_tokens = self.count_tokens(content)
         
+        # Content that already fits needs no optimization, so skip hashing and the cache
+        use_cache = self._use_cache and content_tokens > available_tokens
+        
+        # Check if result is already cached
+        if use_cache:
+            cache_key = generate_cache_key(
+                self._model, 
+                content, 
+                {"prompt": prompt, "max_tokens": max_tokens, "reserved": reserved_tokens}
+            )
+            cached_result = cache_get(cache_key)
+            if cached_result:
+                self.logger.debug("Using cached optimized prompt")
+                return cached_result
+                
         if content_tokens > available_tokens:
             self.logger.info(
                 f"Content exceeds available tokens ({content_tokens} > {available_tokens}), optimizing..."
@@ -308,7 +690,7 @@ class TokenOptimizer:
             )
             
         # Cache the result
-        if self._use_cache:
+        if use_cache:
             cache_set(cache_key, optimized_prompt, CACHE_TTL)
             
         return optimized_prompt
@@ -342,90 +724,87 @@ class TokenOptimizer:
             
         # If still no paragraphs, split by sentence
         if not paragraphs:
-            paragraphs = [p for p in re.split(r'(?<=[.!?])\s+', content) if p.strip()]
+            paragraphs = [p for p in _SENTENCE_SPLIT_PATTERN.split(content) if p.strip()]
+            
+        # Calculate tokens for each paragraph in a single batch
+        para_token_counts = self.count_tokens_batch(paragraphs)
             
         # If query provided, score paragraphs by relevance
         if query:
+            # Tokenize the query once rather than once per paragraph
+            query_tokens = _token_set(query)
             scored_paragraphs = []
-            for para in paragraphs:
-                similarity = calculate_similarity(query, para)
-                scored_paragraphs.append((para, similarity))
+            for para, tokens in zip(paragraphs, para_token_counts):
+                similarity = _jaccard_similarity(query_tokens, _token_set(para))
+                scored_paragraphs.append((para, similarity, tokens))
                 
             # Sort by relevance score
             scored_paragraphs.sort(key=lambda x: x[1], reverse=True)
             
             # Take paragraphs until we reach window size
             selected_paras = []
+            selected_set = set()
             current_tokens = 0
             
             # Always include highest relevance paragraph
             if scored_paragraphs:
-                highest_relevance_para = scored_paragraphs[0][0]
-                highest_relevance_tokens = self.count_tokens(highest_relevance_para)
+                highest_relevance_para, _, highest_relevance_tokens = scored_paragraphs[0]
                 selected_paras.append(highest_relevance_para)
+                selected_set.add(highest_relevance_para)
                 current_tokens += highest_relevance_tokens
                 
             # Add more paragraphs if they meet threshold and fit
-            for para, score in scored_paragraphs[1:]:
+            for para, score, para_tokens in scored_paragraphs[1:]:
                 if score < relevance_threshold:
                     continue
                     
-                para_tokens = self.count_tokens(para)
                 if current_tokens + para_tokens <= window_size - CONTEXT_WINDOW_OVERLAP:
                     selected_paras.append(para)
+                    selected_set.add(para)
                     current_tokens += para_tokens
                     
             # If we don't have enough content, add more paragraphs regardless of relevance
             if current_tokens < window_size * 0.5 and len(scored_paragraphs) > len(selected_paras):
-                for para, _ in scored_paragraphs:
-                    if para in selected_paras:
+                for para, _, para_tokens in scored_paragraphs:
+                    if para in selected_set:
                         continue
                         
-                    para_tokens = self.count_tokens(para)
                     if current_tokens + para_tokens <= window_size - CONTEXT_WINDOW_OVERLAP:
                         selected_paras.append(para)
+                        selected_set.add(para)
                         current_tokens += para_tokens
                         
             # Join selected paragraphs
             windowed_content = '\n\n'.join(selected_paras)
         else:
             # Without query, use positional importance (start, end, middle)
-            # Calculate tokens for each paragraph
-            para_tokens = [(p, self.count_tokens(p)) for p in paragraphs]
-            
             # Allocate tokens for the beginning (40%)
             beginning_allocation = int(window_size * 0.4)
             end_allocation = int(window_size * 0.3)
             middle_allocation = window_size - beginning_allocation - end_allocation
             
-            # Take paragraphs from the beginning
-            beginning_paras = []
-            current_tokens = 0
-            for para, tokens in para_tokens:
-                if current_tokens + tokens <= beginning_allocation:
-                    beginning_paras.append(para)
-                    current_tokens += tokens
-                else:
-                    break
+            # Take paragraphs from the beginning: the longest prefix whose
+            # running token total fits the allocation
+            beginning_count = bisect.bisect_right(
+                list(accumulate(para_token_counts)), beginning_allocation
+            )
+            beginning_paras = paragraphs[:beginning_count]
+            beginning_set = set(beginning_paras)
                     
-            # Take paragraphs from the end
-            end_paras = []
-            current_tokens = 0
-            for para, tokens in reversed(para_tokens):
-                if para in beginning_paras:
-                    continue
-                if current_tokens + tokens <= end_allocation:
-                    end_paras.insert(0, para)
-                    current_tokens += tokens
-                else:
-                    break
+            # Take paragraphs from the end the same way, skipping any already
+            # taken from the beginning
+            end_candidates = [
+                (para, tokens) 
+                for para, tokens in zip(reversed(paragraphs), reversed(para_token_counts))
+                if para not in beginning_set
+            ]
+            end_count = bisect.bisect_right(
+                list(accumulate(tokens for _, tokens in end_candidates)), end_allocation
+            )
+            end_paras = [para for para, _ in reversed(end_candidates[:end_count])]
+            end_set = set(end_paras)
                     
             # Take some from the middle if there's allocation left
-            middle_para_candidates = [
-                (para, tokens) for para, tokens in para_tokens 
-                if para not in beginning_paras and para not in end_paras
-            ]
-            
             middle_paras = []
             current_tokens = 0
             
@@ -435,6 +814,7 @@ class TokenOptimizer:
             
             if middle_start_idx < middle_end_idx:
                 middle_slice = paragraphs[middle_start_idx:middle_end_idx]
+                middle_token_counts = para_token_counts[middle_start_idx:middle_end_idx]
                 middle_indices = list(range(len(middle_slice)))
                 
                 # Sort indices to pick from middle outward
@@ -442,16 +822,17 @@ class TokenOptimizer:
                 
                 for idx in middle_indices:
                     para = middle_slice[idx]
-                    if para in beginning_paras or para in end_paras:
+                    if para in beginning_set or para in end_set:
                         continue
                         
-                    para_token_count = self.count_tokens(para)
+                    para_token_count = middle_token_counts[idx]
                     if current_tokens + para_token_count <= middle_allocation:
                         middle_paras.append(para)
                         current_tokens += para_token_count
                         
             # Combine all sections (keep original order)
-            all_selected_paras = set(beginning_paras + middle_paras + end_paras)
+            all_selected_paras = beginning_set | end_set
+            all_selected_paras.update(middle_paras)
             windowed_content = '\n\n'.join(
                 para for para in paragraphs if para in all_selected_paras
             )
@@ -477,17 +858,19 @@ class TokenOptimizer:
             
         Returns:
             List of document chunks with appropriate overlap
-        """
-        # If document is small enough for single chunk, return as is
-        document_tokens = self.count_tokens(document)
-        if document_tokens <= chunk_size:
-            return [document]
             
-        # Encode document into tokens
+        Raises:
+            ValueError: If overlap is not smaller than chunk_size
+        """
+        # Encode document into tokens once, both to size it and to chunk it
         try:
             tokens = self._encoding.encode(document)
         except Exception as e:
             self.logger.error(f"Error encoding document: {str(e)}")
+            # If document is roughly small enough for single chunk, return as is
+            if len(document) // 4 <= chunk_size:
+                return [document]
+                
             # Fallback to simple chunking by paragraphs
             paragraphs = document.split('\n\n')
             chunks = []
@@ -509,38 +892,91 @@ class TokenOptimizer:
                 
             return chunks
             
-        # Calculate chunk boundaries with overlap
+        # If document is small enough for single chunk, return as is
+        if len(tokens) <= chunk_size:
+            return [document]
+            
+        return self._chunk_tokens(tokens, chunk_size, overlap)
+        
+    def optimize_document_chunks_batch(self, documents: List[str], 
+                                      chunk_size: int, 
+                                      overlap: int = CONTEXT_WINDOW_OVERLAP) -> List[List[str]]:
+        """
+        Splits several documents into chunks, encoding them in a single batch.
+        
+        Args:
+            documents: Document contents
+            chunk_size: Maximum tokens per chunk
+            overlap: Number of tokens to overlap between chunks
+            
+        Returns:
+            List of chunk lists, one per input document
+        """
+        if not documents:
+            return []
+            
+        try:
+            encoded_documents = self._encoding.encode_ordinary_batch(documents)
+        except Exception as e:
+            self.logger.error(f"Error encoding documents: {str(e)}")
+            # Fallback to chunking each document separately
+            return [
+                self.optimize_document_chunks(document, chunk_size, overlap)
+                for document in documents
+            ]
+            
+        # Collect the token windows of every document that needs chunking
         chunk_boundaries = []
-        start = 0
-        
-        while start < len(tokens):
-            end = min(start + chunk_size, len(tokens))
-            chunk_boundaries.append((start, end))
-            start = end - overlap
-            
-        # Create chunks by decoding token ranges
-        chunks = []
-        for start, end in chunk_boundaries:
-            chunk = self._encoding.decode(tokens[start:end])
-            
-            # Ensure chunk boundaries maintain semantic integrity
-            if start > 0:
-                # Try to start at a sentence or paragraph boundary
-                match = re.search(r'^[^\n]*?[.!?]\s+', chunk)
-                if match:
-                    # Remove partial sentence at beginning
-                    chunk = chunk[match.end():]
-                    
-            if end < len(tokens):
-                # Try to end at a sentence boundary
-                match = re.search(r'[.!?]\s+[^\n]*$', chunk)
-                if match:
-                    # Keep the sentence boundary
-                    chunk = chunk[:match.end()]
-                    
-            chunks.append(chunk)
+        chunk_token_ranges = []
+        for tokens in encoded_documents:
+            if len(tokens) <= chunk_size:
+                chunk_boundaries.append(None)
+                continue
+            boundaries = _chunk_boundaries(len(tokens), chunk_size, overlap)
+            chunk_boundaries.append(boundaries)
+            chunk_token_ranges.extend(tokens[start:end] for start, end in boundaries)
+            
+        # Decode the windows of all documents in a single batch
+        decoded_chunks = iter(self._encoding.decode_batch(chunk_token_ranges))
+        
+        document_chunks = []
+        for document, tokens, boundaries in zip(documents, encoded_documents, chunk_boundaries):
+            if boundaries is None:
+                document_chunks.append([document])
+            else:
+                document_chunks.append([
+                    _trim_chunk(next(decoded_chunks), start, end, len(tokens))
+                    for start, end in boundaries
+                ])
+                
+        return document_chunks
+        
+    def _chunk_tokens(self, tokens: List[int], chunk_size: int, overlap: int) -> List[str]:
+        """
+        Decodes overlapping token windows into text chunks trimmed to sentence boundaries.
+        
+        Args:
+            tokens: Encoded document tokens
+            chunk_size: Maximum tokens per chunk
+            overlap: Number of tokens to overlap between chunks
+            
+        Returns:
+            List of document chunks
+            
+        Raises:
+            ValueError: If overlap is not smaller than chunk_size
+        """
+        chunk_boundaries = _chunk_boundaries(len(tokens), chunk_size, overlap)
             
-        return chunks
+        # Decode all token ranges in a single batch
+        decoded_chunks = self._encoding.decode_batch(
+            [tokens[start:end] for start, end in chunk_boundaries]
+        )
+        
+        return [
+            _trim_chunk(chunk, start, end, len(tokens))
+            for (start, end), chunk in zip(chunk_boundaries, decoded_chunks)
+        ]
         
     def detect_similar_request(self, request: Dict, 
                              previous_requests: List[Dict],
@@ -559,25 +995,12 @@ class TokenOptimizer:
         if not previous_requests:
             return False, -1
             
-        # Extract key content from request
-        current_prompt = request.get('prompt', '')
-        current_content = request.get('content', '')
-        current_query = request.get('query', '')
-        
-        # Combine relevant fields for comparison
-        current_text = f"{current_prompt} {current_query} {current_content[:500]}"
+        # Normalize and tokenize the current request once for all comparisons
+        current_tokens = _request_token_set(request)
         
         # Compare with each previous request
         for i, prev_req in enumerate(previous_requests):
-            prev_prompt = prev_req.get('prompt', '')
-            prev_content = prev_req.get('content', '')
-            prev_query = prev_req.get('query', '')
-            
-            prev_text = f"{prev_prompt} {prev_query} {prev_content[:500]}"
-            
-            similarity = calculate_similarity(current_text, prev_text)
-            
-            if similarity >= similarity_threshold:
+            if _is_similar(current_tokens, _request_token_set(prev_req), similarity_threshold):
                 return True, i
                 
         return False, -1
@@ -600,21 +1023,21 @@ class TokenOptimizer:
         batched_requests = []
         request_mapping = {}  # Maps batched request index to list of original indices
         
+        # Index batched requests so only candidates sharing prefix tokens are compared
+        similarity_index = _SimilarityIndex(similarity_threshold)
+        
         for i, request in enumerate(requests):
             # Check if similar to an existing batched request
-            is_similar, similar_idx = self.detect_similar_request(
-                request, batched_requests, similarity_threshold
-            )
+            token_set = _request_token_set(request)
+            similar_idx = similarity_index.find(token_set)
             
-            if is_similar:
+            if similar_idx != -1:
                 # Add to mapping for existing batched request
-                if similar_idx in request_mapping:
-                    request_mapping[similar_idx].append(i)
-                else:
-                    request_mapping[similar_idx] = [i]
+                request_mapping[similar_idx].append(i)
             else:
                 # Add as new batched request
                 batched_requests.append(request)
+                similarity_index.add(token_set)
                 request_mapping[len(batched_requests) - 1] = [i]
                 
         return batched_requests, request_mapping
@@ -714,7 +1137,7 @@ class TokenOptimizer:
         except KeyError as e:
             self.logger.warning(f"Missing parameter in template: {str(e)}")
             # Replace missing parameters with placeholders
-            for key in re.findall(r'\{(\w+)\}', template):
+            for key in _TEMPLATE_VARIABLE_PATTERN.findall(template):
                 if key not in optimized_params:
                     template = template.replace('{' + key + '}', f"[{key}]")
             optimized_template = template.format(**optimized_params)
@@ -741,7 +1164,7 @@ class TokenOptimizer:
             return ""
             
         # Split text into sentences
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        sentences = _SENTENCE_SPLIT_PATTERN.split(text)
         sentences = [s.strip() for s in sentences if s.strip()]
         
         if not sentences:
@@ -750,64 +1173,47 @@ class TokenOptimizer:
         if len(sentences) <= max_sentences:
             return text
             
-        # Score sentences
-        scored_sentences = []
-        
-        for i, sentence in enumerate(sentences):
-            # Base score: position-based importance
-            position_score = 0
-            if i == 0:  # First sentence
-                position_score = 1.0
-            elif i == len(sentences) - 1:  # Last sentence
-                position_score = 0.8
-            elif i < len(sentences) / 3:  # First third
-                position_score = 0.6
-            elif i < len(sentences) * 2 / 3:  # Middle third
-                position_score = 0.4
-            else:  # Last third
-                position_score = 0.3
-                
-            # Length score: prefer medium-length sentences
-            sentence_tokens = self.count_tokens(sentence)
-            if sentence_tokens < 5:
-                length_score = 0.3  # Too short
-            elif sentence_tokens > 30:
-                length_score = 0.5  # Too long
-            else:
-                length_score = 1.0  # Just right
-                
-            # Content score: presence of key terms
-            content_score = 0.5
-            important_terms = ["key", "important", "significant", "main", "critical", "crucial"]
-            if any(term in sentence.lower() for term in important_terms):
-                content_score = 1.0
-                
-            # Query relevance score
-            relevance_score = 0.5
-            if query:
-                relevance_score = calculate_similarity(query, sentence)
-                
-            # Combine scores with appropriate weights
-            total_score = (
-                position_score * 0.3 +
-                length_score * 0.1 +
-                content_score * 0.2 +
-                (relevance_score * 0.4 if query else 0)
-            )
-            
-            scored_sentences.append((i, sentence, total_score))
-            
-        # Sort by score
-        scored_sentences.sort(key=lambda x: x[2], reverse=True)
+        # Score sentences one feature at a time over the whole sentence list
+        sentence_count = len(sentences)
+        sentence_token_counts = self.count_tokens_batch(sentences)
+        
+        # Base score: position-based importance
+        position_scores = _position_scores(sentence_count)
+        
+        # Length score: prefer medium-length sentences
+        length_scores = [_length_score(tokens) for tokens in sentence_token_counts]
+        
+        # Content score: presence of key terms
+        # One alternation scan per sentence instead of one substring scan per term
+        key_term_search = _KEY_TERMS_PATTERN.search
+        content_scores = [
+            1.0 if key_term_search(sentence.lower()) else 0.5
+            for sentence in sentences
+        ]
         
-        # Take top N sentences
-        top_sentences = scored_sentences[:max_sentences]
+        # Combine scores with appropriate weights
+        total_scores = [
+            position * _POSITION_WEIGHT + length * _LENGTH_WEIGHT + content * _CONTENT_WEIGHT
+            for position, length, content in zip(position_scores, length_scores, content_scores)
+        ]
+        
+        # Query relevance score (only weighted in when a query is given)
+        if query:
+            # Tokenize the query once and compare it against every sentence
+            query_tokens = _token_set(query)
+            total_scores = [
+                score + _jaccard_similarity(query_tokens, _token_set(sentence)) * _RELEVANCE_WEIGHT
+                for score, sentence in zip(total_scores, sentences)
+            ]
+            
+        # Take top N sentence indices by score without sorting every sentence
+        top_indices = heapq.nlargest(max_sentences, range(sentence_count), key=total_scores.__getitem__)
         
         # Sort by original position
-        top_sentences.sort(key=lambda x: x[0])
+        top_indices.sort()
         
         # Join selected sentences
-        return " ".join(sentence for _, sentence, _ in top_sentences)
+        return " ".join([sentences[i] for i in top_indices])
         
     def estimate_tokens_saved(self, original: str, optimized: str) -> Dict:
         """
@@ -820,8 +1226,7 @@ class TokenOptimizer:
         Returns:
             Dictionary with token usage statistics and savings
         """
-        original_tokens = self.count_tokens(original)
-        optimized_tokens = self.count_tokens(optimized)
+        original_tokens, optimized_tokens = self.count_tokens_batch([original, optimized])
         
         tokens_saved = original_tokens - optimized_tokens
         percentage_saved = (tokens_saved / original_tokens * 100) if original_tokens > 0 else 0
@@ -4,15 +4,14 @@ functionality to create, retrieve, and upgrade anonymous sessions to authenticat
 Implements session-based tracking for users who want to use the system without logging in.
 """
 
-import uuid  # standard library
 import time  # standard library
 from typing import Dict, List, Optional, Any, Tuple  # standard library
 
-from flask import request, current_app  # Flask ~=2.3.0
+from flask import request, current_app, g, has_app_context  # Flask ~=2.3.0
 
-from ../../core/utils/logger import get_logger
-from ../../data/redis/session_store import SessionStore
-from ../../core/utils/validators import is_valid_uuid
+from ..utils.logger import get_logger
+from ...data.redis.session_store import SessionStore
+from ..utils.validators import is_valid_uuid
 
 # Anonymous session constants
 ANONYMOUS_SESSION_COOKIE_NAME = 'anonymous_session'
@@ -24,6 +23,22 @@ logger = get_logger(__name__)
 _session_store = SessionStore()
 
 
+def _is_valid_session_id(session_id: str) -> bool:
+    """
+    Validates a session ID format, trusting the ID already validated by
+    get_current_session_id during the current request.
+    
+    Args:
+        session_id: The session ID to validate
+        
+    Returns:
+        True if the session ID is valid, False otherwise
+    """
+    if session_id and has_app_context() and g.get('_validated_session_id') == session_id:
+        return True
+    return is_valid_uuid(session_id)
+
+
 def create_anonymous_session(initial_data: Dict = None) -> str:
     """
     Creates a new anonymous session with a unique identifier.
@@ -34,8 +49,20 @@ def create_anonymous_session(initial_data: Dict = None) -> str:
     Returns:
         Anonymous session identifier
     """
-    session_id = str(uuid.uuid4())
+    session_id, _ = _create_anonymous_session(initial_data)
+    return session_id
+
+
+def _create_anonymous_session(initial_data: Dict = None) -> Tuple[str, Dict]:
+    """
+    Creates a new anonymous session and returns it along with the stored data.
     
+    Args:
+        initial_data: Optional initial data for the session
+        
+    Returns:
+        Tuple of (session_id, session_data)
+    """
     if initial_data is None:
         initial_data = {}
     
@@ -46,14 +73,13 @@ def create_anonymous_session(initial_data: Dict = None) -> str:
     # Add creation timestamp
     initial_data['creation_timestamp'] = int(time.time())
     
-    # Create the session
-    _session_store.create_anonymous_session(initial_data)
+    # Create the session; the store assigns the session ID used as the Redis key
+    session_id, session_data = _session_store.create_session_with_data(data=initial_data)
     
     # Log session creation with partially masked ID for security
-    masked_id = session_id[:8] + "..." + session_id[-4:]
-    logger.info(f"Created anonymous session {masked_id}")
+    logger.info("Created anonymous session %.8s...", session_id)
     
-    return session_id
+    return session_id, session_data
 
 
 def get_anonymous_session(session_id: str) -> Optional[Dict]:
@@ -66,26 +92,21 @@ def get_anonymous_session(session_id: str) -> Optional[Dict]:
     Returns:
         Session data or None if not found or expired
     """
-    if not is_valid_uuid(session_id):
-        logger.warning(f"Invalid session ID format: {session_id}")
+    if not _is_valid_session_id(session_id):
+        logger.warning("Invalid session ID format: %s", session_id)
         return None
     
-    session_data = _session_store.get_session(session_id)
+    # Fetch the session and extend it server-side if it is close to expiration
+    session_data = _session_store.get_session_and_refresh(
+        session_id,
+        SESSION_EXTENSION_THRESHOLD,
+        ANONYMOUS_SESSION_TTL
+    )
     
     if not session_data:
-        logger.debug(f"Session not found: {session_id[:8]}...")
+        logger.debug("Session not found: %.8s...", session_id)
         return None
     
-    # Check if session is close to expiration and extend if needed
-    now = int(time.time())
-    creation_time = session_data.get('creation_timestamp', now)
-    time_elapsed = now - creation_time
-    
-    if time_elapsed > (ANONYMOUS_SESSION_TTL - SESSION_EXTENSION_THRESHOLD):
-        # Session is close to expiration, extend it
-        extend_session_ttl(session_id)
-        logger.debug(f"Extended TTL for session approaching expiration: {session_id[:8]}...")
-    
     return session_data
 
 
@@ -100,26 +121,20 @@ def update_anonymous_session(session_id: str, data: Dict) -> bool:
     Returns:
         True if session was updated, False if not found
     """
-    if not is_valid_uuid(session_id):
-        logger.warning(f"Invalid session ID format: {session_id}")
-        return False
-    
-    # Get existing session
-    existing_session = get_anonymous_session(session_id)
-    if not existing_session:
-        logger.warning(f"Attempted to update non-existent session: {session_id[:8]}...")
+    if not _is_valid_session_id(session_id):
+        logger.warning("Invalid session ID format: %s", session_id)
         return False
     
     # Update last modified timestamp
     data['last_updated_timestamp'] = int(time.time())
     
-    # Update the session
+    # The store reports missing sessions itself, so no existence probe is needed
     result = _session_store.update_session(session_id, data)
     
     if result:
-        logger.debug(f"Updated anonymous session {session_id[:8]}...")
+        logger.debug("Updated anonymous session %.8s...", session_id)
     else:
-        logger.warning(f"Failed to update anonymous session {session_id[:8]}...")
+        logger.warning("Attempted to update non-existent session: %.8s...", session_id)
     
     return result
 
@@ -134,16 +149,16 @@ def delete_anonymous_session(session_id: str) -> bool:
     Returns:
         True if session was deleted, False if not found
     """
-    if not is_valid_uuid(session_id):
-        logger.warning(f"Invalid session ID format: {session_id}")
+    if not _is_valid_session_id(session_id):
+        logger.warning("Invalid session ID format: %s", session_id)
         return False
     
     result = _session_store.delete_session(session_id)
     
     if result:
-        logger.info(f"Deleted anonymous session {session_id[:8]}...")
+        logger.info("Deleted anonymous session %.8s...", session_id)
     else:
-        logger.debug(f"Attempted to delete non-existent session: {session_id[:8]}...")
+        logger.debug("Attempted to delete non-existent session: %.8s...", session_id)
     
     return result
 
@@ -160,32 +175,31 @@ def add_document_to_session(session_id: str, document_id: str, document_title: s
     Returns:
         True if document was added, False if session not found
     """
-    # Get existing session
-    session_data = get_anonymous_session(session_id)
-    if not session_data:
-        logger.warning(f"Attempted to add document to non-existent session: {session_id[:8]}...")
+    if not _is_valid_session_id(session_id):
+        logger.warning("Invalid session ID format: %s", session_id)
         return False
-    
-    # Get or initialize documents list
-    documents = session_data.get('documents', [])
-    
+
+    now = int(time.time())
+
     # Create document entry
     document_entry = {
         'id': document_id,
         'title': document_title,
-        'timestamp': int(time.time())
+        'timestamp': now
     }
-    
-    # Append to list
-    documents.append(document_entry)
-    
-    # Update session
-    update_data = {'documents': documents}
-    result = update_anonymous_session(session_id, update_data)
-    
+
+    # Append in one read/write cycle instead of get + update round trips
+    result = _session_store.append_document(
+        session_id,
+        document_entry,
+        {'last_updated_timestamp': now}
+    )
+
     if result:
-        logger.info(f"Added document {document_id[:8]}... to session {session_id[:8]}...")
-    
+        logger.info("Added document %.8s... to session %.8s...", document_id, session_id)
+    else:
+        logger.warning("Attempted to add document to non-existent session: %.8s...", session_id)
+
     return result
 
 
@@ -202,7 +216,7 @@ def get_session_documents(session_id: str) -> List:
     # Get existing session
     session_data = get_anonymous_session(session_id)
     if not session_data:
-        logger.debug(f"Attempted to get documents from non-existent session: {session_id[:8]}...")
+        logger.debug("Attempted to get documents from non-existent session: %.8s...", session_id)
         return []
     
     # Get documents list or empty list if not found
@@ -220,16 +234,16 @@ def extend_session_ttl(session_id: str) -> bool:
     Returns:
         True if session TTL was extended, False if not found
     """
-    if not is_valid_uuid(session_id):
-        logger.warning(f"Invalid session ID format: {session_id}")
+    if not _is_valid_session_id(session_id):
+        logger.warning("Invalid session ID format: %s", session_id)
         return False
     
     result = _session_store.extend_session(session_id, ANONYMOUS_SESSION_TTL)
     
     if result:
-        logger.debug(f"Extended TTL for session {session_id[:8]}...")
+        logger.debug("Extended TTL for session %.8s...", session_id)
     else:
-        logger.warning(f"Failed to extend TTL for non-existent session: {session_id[:8]}...")
+        logger.warning("Failed to extend TTL for non-existent session: %.8s...", session_id)
     
     return result
 
@@ -245,24 +259,18 @@ def upgrade_to_authenticated(anonymous_session_id: str, user_id: str) -> Optiona
     Returns:
         New authenticated session ID or None if upgrade failed
     """
-    if not is_valid_uuid(anonymous_session_id):
-        logger.warning(f"Invalid session ID format: {anonymous_session_id}")
+    if not _is_valid_session_id(anonymous_session_id):
+        logger.warning("Invalid session ID format: %s", anonymous_session_id)
         return None
     
-    # Get anonymous session
-    session_data = get_anonymous_session(anonymous_session_id)
-    if not session_data:
-        logger.warning(f"Attempted to upgrade non-existent session: {anonymous_session_id[:8]}...")
-        return None
-    
-    # Upgrade the session
+    # Upgrade the session; the store reports missing sessions itself
     authenticated_session_id = _session_store.upgrade_session(anonymous_session_id, user_id)
     
     if authenticated_session_id:
         masked_user_id = user_id[:4] + "..." if len(user_id) > 8 else user_id
-        logger.info(f"Upgraded anonymous session {anonymous_session_id[:8]}... to authenticated session for user {masked_user_id}")
+        logger.info("Upgraded anonymous session %.8s... to authenticated session for user %s", anonymous_session_id, masked_user_id)
     else:
-        logger.error(f"Failed to upgrade anonymous session {anonymous_session_id[:8]}...")
+        logger.error("Failed to upgrade anonymous session %.8s...", anonymous_session_id)
     
     return authenticated_session_id
 
@@ -274,46 +282,55 @@ def get_current_session_id() -> Optional[str]:
     Returns:
         Current session ID or None if not found
     """
-    # Try to get from cookie
-    session_id = None
-    
     try:
-        if hasattr(request, 'cookies'):
-            session_id = request.cookies.get(ANONYMOUS_SESSION_COOKIE_NAME)
+        # Reuse the ID already validated during this request
+        session_id = g.get('_validated_session_id')
+        if session_id:
+            return session_id
         
-        # If not in cookie, try to get from header
-        if not session_id and hasattr(request, 'headers'):
-            session_id = request.headers.get('X-Anonymous-Session-ID')
+        # Try cookie first, then header; Flask requests always carry both
+        session_id = (
+            request.cookies.get(ANONYMOUS_SESSION_COOKIE_NAME)
+            or request.headers.get('X-Anonymous-Session-ID')
+        )
         
         # Validate UUID format
         if session_id and not is_valid_uuid(session_id):
-            logger.warning(f"Invalid session ID format in request: {session_id}")
+            logger.warning("Invalid session ID format in request: %s", session_id)
             return None
         
+        if session_id:
+            g._validated_session_id = session_id
+        
         return session_id
+    except RuntimeError:
+        # Called outside of a request context
+        return None
     except Exception as e:
-        logger.error(f"Error getting session ID from request: {str(e)}")
+        logger.error("Error getting session ID from request: %s", e)
         return None
 
 
-def set_session_cookie(session_id: str, response) -> Any:
+def set_session_cookie(session_id: str, response, secure: Optional[bool] = None) -> Any:
     """
     Sets the anonymous session ID cookie in the response.
     
     Args:
         session_id: The session ID to set in the cookie
         response: Flask response object
+        secure: Optional cached SESSION_COOKIE_SECURE value (read from app config if not provided)
         
     Returns:
         Flask response object with cookie set
     """
-    if not is_valid_uuid(session_id):
-        logger.warning(f"Invalid session ID format: {session_id}")
+    if not _is_valid_session_id(session_id):
+        logger.warning("Invalid session ID format: %s", session_id)
         return response
     
     # Set the cookie with appropriate security settings
     max_age = ANONYMOUS_SESSION_TTL
-    secure = current_app.config.get('SESSION_COOKIE_SECURE', False)
+    if secure is None:
+        secure = current_app.config.get('SESSION_COOKIE_SECURE', False)
     httponly = True
     samesite = 'Lax'
     
@@ -334,6 +351,8 @@ class AnonymousSessionManager:
     Class for managing anonymous user sessions with integrated Flask support.
     """
     
+    __slots__ = ('_session_store', '_logger', '_cookie_secure')
+    
     def __init__(self, session_store=None):
         """
         Initialize the anonymous session manager.
@@ -343,6 +362,8 @@ class AnonymousSessionManager:
         """
         self._session_store = session_store or _session_store
         self._logger = logger
+        # SESSION_COOKIE_SECURE, read from app config on first use
+        self._cookie_secure = None
     
     def initialize_session(self) -> Tuple[str, Dict, bool]:
         """
@@ -359,15 +380,14 @@ class AnonymousSessionManager:
             # Retrieve existing session
             session_data = get_anonymous_session(session_id)
             if session_data:
-                self._logger.debug(f"Retrieved existing anonymous session {session_id[:8]}...")
+                self._logger.debug("Retrieved existing anonymous session %.8s...", session_id)
                 return session_id, session_data, is_new_session
         
         # Create new session if no valid session was found
         is_new_session = True
-        session_id = create_anonymous_session()
-        session_data = get_anonymous_session(session_id)
+        session_id, session_data = _create_anonymous_session()
         
-        self._logger.info(f"Created new anonymous session {session_id[:8]}...")
+        self._logger.info("Created new anonymous session %.8s...", session_id)
         return session_id, session_data, is_new_session
     
     def get_session(self) -> Optional[Dict]:
@@ -464,20 +484,25 @@ class AnonymousSessionManager:
             session_id = get_current_session_id()
         
         if session_id:
-            return set_session_cookie(session_id, response)
+            if self._cookie_secure is None:
+                self._cookie_secure = current_app.config.get('SESSION_COOKIE_SECURE', False)
+            return set_session_cookie(session_id, response, self._cookie_secure)
         return response
     
-    def upgrade_to_authenticated_user(self, user_id: str) -> Optional[str]:
+    def upgrade_to_authenticated_user(self, user_id: str, session_id: str = None) -> Optional[str]:
         """
         Upgrades anonymous session to authenticated user session.
         
         Args:
             user_id: User ID to associate with the authenticated session
+            session_id: Anonymous session to upgrade (default: the current request's
+                        session); passing it allows calls outside the request context
             
         Returns:
             New authenticated session ID or None if failed
         """
-        session_id = get_current_session_id()
+        if session_id is None:
+            session_id = get_current_session_id()
         if session_id:
             return upgrade_to_authenticated(session_id, user_id)
         return None
\ No newline at end of file
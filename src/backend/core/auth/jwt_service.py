@@ -5,50 +5,236 @@ access and refresh tokens for authenticated users with appropriate
 expiry times and security features.
 """
 
-import uuid
-from datetime import datetime
+import base64
+import hashlib
+import heapq
+import hmac
+import json
+import os
+import threading
+from collections import OrderedDict
+from json.encoder import encode_basestring_ascii
 import time
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List
 
 import jwt  # PyJWT 2.7.0
 
 from ..utils.logger import get_logger
-from ..utils.security import encode_jwt, decode_jwt, generate_token
+from ..utils.security import encode_jwt, decode_jwt
 
 # Constants
 ACCESS_TOKEN_EXPIRY = 7200  # 2 hours in seconds
 REFRESH_TOKEN_EXPIRY = 604800  # 7 days in seconds
+VALIDATION_CACHE_SIZE = 4096  # Max number of verified token payloads kept in memory
+MAX_INVALIDATED_TOKENS_PER_USER = 128  # Unexpired invalidations beyond this revoke all of the user's tokens issued so far
+JTI_BYTES = 12  # Random bytes per JWT ID; encodes to 16 URL-safe characters
+RANDOM_POOL_SIZE = 4096  # Bytes read from os.urandom per pool refill
+
+# Keyed BLAKE2b MAC algorithm name (internal use only, not an RFC 7518 algorithm)
+BLAKE2B_ALGORITHM = "BLAKE2B"
+# Key ID header value per token type, so a token of the wrong type can be
+# rejected from its header without verifying the signature
+TOKEN_TYPE_KIDS = {"access": "a", "refresh": "r"}
+_NO_INVALIDATIONS = frozenset()
+# Claims set by the service itself rather than passed as additional claims
+_RESERVED_CLAIMS = frozenset(("sub", "type", "jti", "iat", "exp"))
+
+# HMAC algorithms signed directly with a prepared key instead of through PyJWT
+_HMAC_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
 
 # Configure logger
 logger = get_logger(__name__)
 
 
+class _RandomPool:
+    """
+    Serves URL-safe random tokens from a buffer refilled from os.urandom in
+    large blocks, amortizing the syscall across many token IDs.
+    """
+
+    def __init__(self, size: int = RANDOM_POOL_SIZE):
+        """
+        Initialize an empty pool.
+        
+        Args:
+            size: Number of random bytes read per refill
+        """
+        self._size = size
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Discard buffered bytes. Called in forked children so worker processes
+        never hand out the same bytes as their parent or siblings.
+        """
+        self._lock = threading.Lock()
+        self._buffer = b""
+        self._offset = 0
+
+    def token(self, nbytes: int) -> str:
+        """
+        Take nbytes of randomness from the pool, encoded as URL-safe base64.
+        
+        Args:
+            nbytes: Number of random bytes to use
+        
+        Returns:
+            URL-safe token string without padding
+        """
+        with self._lock:
+            if self._offset + nbytes > len(self._buffer):
+                self._buffer = os.urandom(self._size)
+                self._offset = 0
+            chunk = self._buffer[self._offset:self._offset + nbytes]
+            self._offset += nbytes
+        return base64.urlsafe_b64encode(chunk).rstrip(b"=").decode("ascii")
+
+
+_JTI_POOL = _RandomPool()
+os.register_at_fork(after_in_child=_JTI_POOL.reset)
+
+
+class _Blake2bMACAlgorithm(jwt.algorithms.Algorithm):
+    """
+    PyJWT algorithm signing with keyed BLAKE2b (32-byte digest), which needs no
+    HMAC wrapping and is faster than HMAC-SHA256. Only for tokens this service
+    both issues and verifies.
+    """
+
+    def prepare_key(self, key):
+        """
+        Convert the secret to bytes, hashing secrets longer than BLAKE2b's 64-byte key limit.
+        """
+        key = key.encode("utf-8") if isinstance(key, str) else key
+        if len(key) > hashlib.blake2b.MAX_KEY_SIZE:
+            key = hashlib.blake2b(key).digest()
+        return key
+
+    def sign(self, msg, key):
+        """
+        Compute the MAC of msg.
+        """
+        return hashlib.blake2b(msg, key=key, digest_size=32).digest()
+
+    def verify(self, msg, key, sig):
+        """
+        Check a MAC in constant time.
+        """
+        return hmac.compare_digest(sig, self.sign(msg, key))
+
+    @staticmethod
+    def to_jwk(key_obj, *args, **kwargs):
+        raise NotImplementedError("JWK export is not supported for BLAKE2B")
+
+    @staticmethod
+    def from_jwk(jwk):
+        raise NotImplementedError("JWK import is not supported for BLAKE2B")
+
+
+_BLAKE2B = _Blake2bMACAlgorithm()
+
+# Register with PyJWT so decode_jwt can verify BLAKE2B tokens
+try:
+    jwt.register_algorithm(BLAKE2B_ALGORITHM, _BLAKE2B)
+except ValueError:
+    pass  # Already registered
+
+
+def _base64url(data: bytes) -> bytes:
+    """
+    Encode bytes as unpadded URL-safe base64, as used by JWT segments.
+    
+    Args:
+        data: Bytes to encode
+    
+    Returns:
+        Encoded segment
+    """
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
 class JWTService:
     """
     Service for creating, validating, refreshing, and invalidating JWT tokens for authentication.
     """
 
+    __slots__ = (
+        '_secret_key', '_algorithm', '_access_token_expiry', '_refresh_token_expiry',
+        '_invalidated_tokens', '_invalidation_lock', '_invalidation_order', 
+        '_invalidation_expiry_heap', '_invalidation_cutoffs', '_validation_cache', '_validation_cache_lock', '_validation_cache_size',
+        '_header_segments', '_mac_template', '_foreign_header_segments'
+    )
+
     def __init__(
         self, 
         secret_key: str, 
         algorithm: str = "HS256",
         access_token_expiry: int = ACCESS_TOKEN_EXPIRY, 
-        refresh_token_expiry: int = REFRESH_TOKEN_EXPIRY
+        refresh_token_expiry: int = REFRESH_TOKEN_EXPIRY,
+        validation_cache_size: int = VALIDATION_CACHE_SIZE
     ):
         """
         Initialize JWT service with secret key and configuration.
         
         Args:
             secret_key: Secret key used for signing tokens
-            algorithm: Algorithm used for token signing (default: HS256)
+            algorithm: Algorithm used for token signing (default: HS256); "BLAKE2B"
+                       selects a faster keyed BLAKE2b MAC for tokens only this service verifies
             access_token_expiry: Expiry time for access tokens in seconds (default: 2 hours)
             refresh_token_expiry: Expiry time for refresh tokens in seconds (default: 7 days)
+            validation_cache_size: Max number of verified payloads to cache (default: 4096);
+                                   0 disables the validation cache
         """
         self._secret_key = secret_key
         self._algorithm = algorithm
         self._access_token_expiry = access_token_expiry
         self._refresh_token_expiry = refresh_token_expiry
-        self._invalidated_tokens = {}  # user_id -> set of invalidated token_ids
+        # user_id -> frozenset of invalidated token_ids; writers swap in a new
+        # frozenset under the lock so validation can read without locking
+        self._invalidated_tokens = {}
+        self._invalidation_lock = threading.Lock()
+        # user_id -> OrderedDict of invalidated token_id -> (invalidated_at, expires_at or None),
+        # oldest first, for the per-user cap
+        self._invalidation_order = {}
+        # Min-heap of (expires_at, user_id, token_id) for invalidations with a known expiry
+        self._invalidation_expiry_heap = []
+        # user_id -> (issued_at, expires_at): tokens issued at or before issued_at are
+        # rejected until expires_at; replaced as a whole tuple so reads need no lock
+        self._invalidation_cutoffs = {}
+        # token hash -> verified payload, in LRU order
+        self._validation_cache = OrderedDict()
+        self._validation_cache_lock = threading.Lock()
+        self._validation_cache_size = validation_cache_size
+        
+        # For MAC algorithms, prepare the encoded header and keyed MAC once;
+        # each token then only serializes its payload and copies the MAC state
+        digest = _HMAC_DIGESTS.get(algorithm)
+        if digest is not None or algorithm == BLAKE2B_ALGORITHM:
+            self._header_segments = {}
+            for token_type, kid in TOKEN_TYPE_KIDS.items():
+                header = json.dumps({"alg": algorithm, "typ": "JWT", "kid": kid}, separators=(",", ":"))
+                self._header_segments[token_type] = _base64url(header.encode("utf-8"))
+            if digest is not None:
+                self._mac_template = hmac.new(secret_key.encode("utf-8"), digestmod=digest)
+            else:
+                self._mac_template = hashlib.blake2b(key=_BLAKE2B.prepare_key(secret_key), digest_size=32)
+        else:
+            self._header_segments = {}
+            self._mac_template = None
+        
+        # expected type -> header segments of the other token types
+        self._foreign_header_segments = {
+            expected_type: frozenset(
+                segment.decode("ascii") 
+                for token_type, segment in self._header_segments.items() 
+                if token_type != expected_type
+            )
+            for expected_type in TOKEN_TYPE_KIDS
+        }
     
     def create_access_token(self, user_id: str, additional_claims: Dict[str, Any] = None) -> str:
         """
@@ -62,7 +248,7 @@ class JWTService:
             JWT access token string
         """
         # Generate a unique JWT ID
-        jti = generate_token(16)  # Use a shorter token for JWT ID
+        jti = _JTI_POOL.token(JTI_BYTES)
         
         # Create the base payload
         payload = {
@@ -71,17 +257,16 @@ class JWTService:
             "jti": jti,  # JWT ID for token tracking/revocation
         }
         
-        # Add any additional claims
-        if additional_claims:
-            payload.update(additional_claims)
-        
-        # Create the token with expiry
-        token = encode_jwt(
-            payload, 
-            self._secret_key, 
-            algorithm=self._algorithm, 
-            expiration_seconds=self._access_token_expiry
-        )
+        if not additional_claims and self._mac_template is not None and isinstance(user_id, str):
+            # Common shape: format the payload JSON directly
+            token = self._encode_plain_access_token(user_id, jti, int(time.time()))
+        else:
+            # Add any additional claims
+            if additional_claims:
+                payload.update(additional_claims)
+            
+            # Create the token with expiry
+            token = self._encode_token(payload, self._access_token_expiry)
         
         logger.info("Created access token", 
                    user_id=user_id, 
@@ -89,6 +274,31 @@ class JWTService:
         
         return token
     
+    def create_tokens_batch(self, user_ids: List[str]) -> List[str]:
+        """
+        Create access tokens for many users at once, e.g. for service accounts or load tests.
+        
+        All tokens share one issue time and a single log entry is written for the batch.
+        
+        Args:
+            user_ids: User identifiers to create access tokens for
+        
+        Returns:
+            JWT access token strings, in the order of user_ids
+        """
+        if self._mac_template is None:
+            return [self.create_access_token(user_id) for user_id in user_ids]
+        
+        now = int(time.time())
+        tokens = [
+            self._encode_plain_access_token(user_id, _JTI_POOL.token(JTI_BYTES), now)
+            for user_id in user_ids
+        ]
+        
+        logger.info("Created access tokens", token_count=len(tokens))
+        
+        return tokens
+    
     def create_refresh_token(self, user_id: str) -> Dict[str, Any]:
         """
         Create a new refresh token for the specified user.
@@ -100,7 +310,7 @@ class JWTService:
             Dictionary containing token string, user_id, and expiry
         """
         # Generate a unique JWT ID
-        jti = generate_token(16)  # Use a shorter token for JWT ID
+        jti = _JTI_POOL.token(JTI_BYTES)
         
         # Create the payload
         payload = {
@@ -113,12 +323,7 @@ class JWTService:
         expiry = int(time.time()) + self._refresh_token_expiry
         
         # Create the token with expiry
-        token = encode_jwt(
-            payload, 
-            self._secret_key, 
-            algorithm=self._algorithm, 
-            expiration_seconds=self._refresh_token_expiry
-        )
+        token = self._encode_token(payload, self._refresh_token_expiry)
         
         logger.info("Created refresh token", 
                    user_id=user_id, 
@@ -169,15 +374,26 @@ class JWTService:
         if not token:
             return {"is_valid": False, "error": "No token provided"}
         
+        # Reject tokens whose header marks them as another type before
+        # paying for signature verification and payload decoding
+        foreign_segments = self._foreign_header_segments.get(expected_type)
+        if foreign_segments and token.partition(".")[0] in foreign_segments:
+            return {"is_valid": False, "error": "Invalid token type"}
+        
         try:
-            # Decode the token
-            payload = decode_jwt(token, self._secret_key, algorithm=self._algorithm)
+            # Decode the token, reusing the verified payload for tokens seen before
+            payload = self._decode_token(token)
             
             # Check if the token is invalidated
             user_id = payload.get("sub")
             token_id = payload.get("jti")
             
-            if user_id and token_id and self._is_token_invalidated(user_id, token_id):
+            # Same check as _is_token_invalidated, inlined on this hot path
+            user_tokens = self._invalidated_tokens.get(user_id) if user_id else None
+            if user_tokens and token_id and ("all" in user_tokens or token_id in user_tokens):
+                return {"is_valid": False, "error": "Token invalidated"}
+            cutoff = self._invalidation_cutoffs.get(user_id) if user_id else None
+            if cutoff and payload.get("iat", 0) <= cutoff[0]:
                 return {"is_valid": False, "error": "Token invalidated"}
             
             # Check token type
@@ -196,6 +412,126 @@ class JWTService:
             logger.error(f"Unexpected error validating token: {str(e)}")
             return {"is_valid": False, "error": "Token validation failed"}
     
+    def _encode_token(self, payload: Dict[str, Any], expiration_seconds: int) -> str:
+        """
+        Encode and sign a token with issued-at and expiry claims.
+        
+        MAC tokens are assembled directly from the prepared header for their
+        type and the MAC state; other algorithms go through encode_jwt.
+        
+        Args:
+            payload: Claims to include in the token
+            expiration_seconds: Token lifetime in seconds
+        
+        Returns:
+            Encoded JWT string
+        """
+        if self._mac_template is None:
+            return encode_jwt(
+                payload, 
+                self._secret_key, 
+                algorithm=self._algorithm, 
+                expiration_seconds=expiration_seconds
+            )
+        
+        now = int(time.time())
+        claims = {**payload, "iat": now, "exp": now + expiration_seconds}
+        return self._sign_claims(self._header_segments[payload["type"]], claims)
+    
+    def _sign_claims(self, header_segment: bytes, claims: Dict[str, Any]) -> str:
+        """
+        Serialize claims and sign them with the prepared MAC state.
+        
+        Args:
+            header_segment: Prepared base64url header segment
+            claims: Complete claims, including iat and exp
+        
+        Returns:
+            Encoded JWT string
+        """
+        return self._sign_payload(header_segment, json.dumps(claims, separators=(",", ":")))
+    
+    def _encode_plain_access_token(self, user_id: str, jti: str, issued_at: int) -> str:
+        """
+        Encode an access token without additional claims by formatting its payload directly.
+        
+        The output is byte-for-byte what json.dumps produces for the same claims;
+        the user ID is escaped with the same encoder and the JWT ID is URL-safe base64.
+        
+        Args:
+            user_id: User identifier to include in the token
+            jti: JWT ID for the token
+            issued_at: Issue time as a Unix timestamp
+        
+        Returns:
+            Encoded JWT string
+        """
+        payload_json = '{"sub":%s,"type":"access","jti":"%s","iat":%d,"exp":%d}' % (
+            encode_basestring_ascii(user_id), jti, issued_at, issued_at + self._access_token_expiry
+        )
+        return self._sign_payload(self._header_segments["access"], payload_json)
+    
+    def _sign_payload(self, header_segment: bytes, payload_json: str) -> str:
+        """
+        Sign a serialized payload with the prepared MAC state.
+        
+        Args:
+            header_segment: Prepared base64url header segment
+            payload_json: Serialized claims
+        
+        Returns:
+            Encoded JWT string
+        """
+        payload_segment = _base64url(payload_json.encode("utf-8"))
+        
+        signing_input = header_segment + b"." + payload_segment
+        signature = self._mac_template.copy()
+        signature.update(signing_input)
+        
+        return (signing_input + b"." + _base64url(signature.digest())).decode("ascii")
+    
+    def _decode_token(self, token: str) -> Dict[str, Any]:
+        """
+        Decode and verify a token, caching verified payloads by token hash.
+        
+        A cached payload is only reused while its expiry lies in the future;
+        invalidation and type checks are still applied by the caller on every call.
+        
+        Args:
+            token: JWT token to decode
+        
+        Returns:
+            Copy of the verified token payload
+        
+        Raises:
+            jwt.ExpiredSignatureError: If token has expired
+            jwt.InvalidTokenError: If token is invalid
+        """
+        if not self._validation_cache_size:
+            return decode_jwt(token, self._secret_key, algorithm=self._algorithm)
+        
+        cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        
+        with self._validation_cache_lock:
+            payload = self._validation_cache.get(cache_key)
+            if payload is not None:
+                if payload["exp"] > time.time():
+                    self._validation_cache.move_to_end(cache_key)
+                    return dict(payload)
+                # Expired: drop it and let decode_jwt raise the expiry error
+                del self._validation_cache[cache_key]
+        
+        payload = decode_jwt(token, self._secret_key, algorithm=self._algorithm)
+        
+        if "exp" in payload:
+            with self._validation_cache_lock:
+                self._validation_cache[cache_key] = payload
+                self._validation_cache.move_to_end(cache_key)
+                if len(self._validation_cache) > self._validation_cache_size:
+                    self._validation_cache.popitem(last=False)
+        
+        return dict(payload)
+    
     def get_user_id_from_token(self, token: str) -> Optional[str]:
         """
         Extract user_id from a token without full validation.
@@ -210,9 +546,11 @@ class JWTService:
             return None
             
         try:
-            # Decode the token without verification to extract user_id
-            payload = jwt.decode(token, options={"verify_signature": False})
-            return payload.get("sub")
+            # Decode the payload segment directly; the signature is not verified
+            _, payload_segment, _ = token.split(".")
+            payload_segment += "=" * (-len(payload_segment) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(payload_segment))
+            return payload.get("sub") if isinstance(payload, dict) else None
         except Exception as e:
             logger.debug(f"Error extracting user_id from token: {str(e)}")
             return None
@@ -248,12 +586,14 @@ class JWTService:
             }
         
         # Generate new access token
-        # Preserve any additional claims from the refresh token
-        additional_claims = {}
-        for key, value in payload.items():
-            if key not in ["sub", "type", "jti", "iat", "exp"]:
-                additional_claims[key] = value
-                
+        # Preserve any additional claims from the refresh token; refresh tokens
+        # normally carry only the reserved claims, so skip building a dict then
+        additional_claims = None
+        if not _RESERVED_CLAIMS.issuperset(payload):
+            additional_claims = {
+                key: value for key, value in payload.items() if key not in _RESERVED_CLAIMS
+            }
+        
         new_access_token = self.create_access_token(user_id, additional_claims)
         
         return {
@@ -263,7 +603,13 @@ class JWTService:
             "expires_in": self._access_token_expiry
         }
     
-    def invalidate_tokens(self, user_id: str, token_ids: List[str] = None, invalidate_all: bool = False) -> bool:
+    def invalidate_tokens(
+        self, 
+        user_id: str, 
+        token_ids: List[str] = None, 
+        invalidate_all: bool = False,
+        expires_at: Optional[int] = None
+    ) -> bool:
         """
         Invalidate specific tokens or all tokens for a user.
         
@@ -271,69 +617,177 @@ class JWTService:
             user_id: The user whose tokens to invalidate
             token_ids: Specific token IDs to invalidate (optional)
             invalidate_all: Whether to invalidate all tokens for the user
+            expires_at: Expiry timestamp of the given tokens (optional); once it has
+                        passed, clean_invalidated_tokens drops their entries
         
         Returns:
             True if invalidation succeeded, False otherwise
         """
-        # Initialize user's invalidated tokens set if not exists
-        if user_id not in self._invalidated_tokens:
-            self._invalidated_tokens[user_id] = set()
-        
         # Handle invalidate all case
         if invalidate_all:
-            self._invalidated_tokens[user_id].add("all")
+            with self._invalidation_lock:
+                user_tokens = self._invalidated_tokens.get(user_id, _NO_INVALIDATIONS)
+                self._invalidated_tokens[user_id] = user_tokens | {"all"}
             logger.info("Invalidated all tokens", user_id=user_id)
             return True
         
         # Add specific token IDs to invalidated set
         if token_ids:
-            self._invalidated_tokens[user_id].update(token_ids)
+            with self._invalidation_lock:
+                order = self._invalidation_order.setdefault(user_id, OrderedDict())
+                invalidated_at = int(time.time())
+                for token_id in token_ids:
+                    order[token_id] = (invalidated_at, expires_at)
+                    order.move_to_end(token_id)
+                if expires_at is not None:
+                    for token_id in token_ids:
+                        heapq.heappush(self._invalidation_expiry_heap, (expires_at, user_id, token_id))
+                
+                # Past the cap, first drop invalidations whose tokens have expired on their own
+                if len(order) > MAX_INVALIDATED_TOKENS_PER_USER:
+                    self._drop_expired_invalidations(time.time())
+                
+                if len(order) > MAX_INVALIDATED_TOKENS_PER_USER:
+                    # A revocation must never be forgotten while its token may still be
+                    # valid, so bound memory by revoking every token issued so far instead,
+                    # until the last of the dropped tokens would have expired anyway
+                    self._add_invalidation_cutoff(user_id, order)
+                    user_tokens = frozenset(order)
+                    if "all" in self._invalidated_tokens.get(user_id, _NO_INVALIDATIONS):
+                        user_tokens |= {"all"}
+                    self._invalidated_tokens[user_id] = user_tokens
+                    logger.warning("Invalidation limit exceeded, invalidated all tokens issued so far",
+                                  user_id=user_id)
+                    return True
+                
+                user_tokens = frozenset(order)
+                if "all" in self._invalidated_tokens.get(user_id, _NO_INVALIDATIONS):
+                    user_tokens |= {"all"}
+                self._invalidated_tokens[user_id] = user_tokens
             logger.info("Invalidated tokens", 
                        user_id=user_id, 
                        token_count=len(token_ids))
             return True
         
+        with self._invalidation_lock:
+            self._invalidated_tokens.setdefault(user_id, _NO_INVALIDATIONS)
         return False
     
     def clean_invalidated_tokens(self) -> int:
         """
         Remove expired tokens from the invalidated tokens list.
         
+        Only entries registered with an expiry are removed, in expiry order, along
+        with expired issued-at cutoffs; an expired token is rejected by signature
+        validation regardless.
+        
         Returns:
             Number of users processed for cleanup
         """
+        now = time.time()
         users_processed = 0
         
-        for user_id in list(self._invalidated_tokens.keys()):
-            users_processed += 1
+        with self._invalidation_lock:
+            self._drop_expired_invalidations(now)
             
-            # If user has an empty set of invalidated tokens, clean it up
-            if not self._invalidated_tokens[user_id]:
-                del self._invalidated_tokens[user_id]
+            for user_id in list(self._invalidated_tokens.keys()):
+                users_processed += 1
+                
+                # If user has an empty set of invalidated tokens, clean it up
+                if not self._invalidated_tokens[user_id]:
+                    del self._invalidated_tokens[user_id]
+                    self._invalidation_order.pop(user_id, None)
         
         logger.info("Cleaned up token invalidation data", 
                    users_processed=users_processed)
         
         return users_processed
     
-    def _is_token_invalidated(self, user_id: str, token_id: str) -> bool:
+    def _add_invalidation_cutoff(self, user_id: str, order: OrderedDict) -> None:
+        """
+        Replace a user's invalidations with an issued-at cutoff that rejects every
+        token issued before the current second. Invalidations made during the current
+        second are kept in order, since their tokens may have been issued in it too,
+        unless they alone exceed the cap. Must be called with the invalidation lock held.
+        
+        Args:
+            user_id: The user whose tokens to invalidate
+            order: The user's invalidated token_id -> (invalidated_at, expires_at or None)
+        """
+        now = int(time.time())
+        issued_at = now - 1
+        recent = {token_id for token_id, (invalidated_at, _) in order.items() if invalidated_at >= now}
+        if len(recent) > MAX_INVALIDATED_TOKENS_PER_USER:
+            # Tokens issued during this second cannot be told apart, so reject them as well
+            issued_at = now
+            recent = set()
+        
+        # Keep the cutoff until every dropped token has expired; tokens without a known
+        # expiry live at most as long as this service issues tokens for
+        longest_lifetime = now + max(self._access_token_expiry, self._refresh_token_expiry)
+        expires_at = max(
+            longest_lifetime if token_expires_at is None else token_expires_at
+            for token_id, (_, token_expires_at) in order.items()
+            if token_id not in recent
+        )
+        for token_id in list(order):
+            if token_id not in recent:
+                del order[token_id]
+        
+        previous = self._invalidation_cutoffs.get(user_id)
+        if previous is not None:
+            issued_at = max(issued_at, previous[0])
+            expires_at = max(expires_at, previous[1])
+        self._invalidation_cutoffs[user_id] = (issued_at, expires_at)
+    
+    def _drop_expired_invalidations(self, now: float) -> None:
+        """
+        Remove invalidations whose tokens have expired. Must be called with
+        the invalidation lock held.
+        
+        Args:
+            now: Current timestamp
+        """
+        # Collect invalidations whose tokens have expired, per user
+        expired = {}
+        expiry_heap = self._invalidation_expiry_heap
+        while expiry_heap and expiry_heap[0][0] <= now:
+            _, user_id, token_id = heapq.heappop(expiry_heap)
+            expired.setdefault(user_id, set()).add(token_id)
+        
+        for user_id, token_ids in expired.items():
+            order = self._invalidation_order.get(user_id)
+            if order is not None:
+                for token_id in token_ids:
+                    order.pop(token_id, None)
+            user_tokens = self._invalidated_tokens.get(user_id)
+            if user_tokens is not None:
+                self._invalidated_tokens[user_id] = user_tokens.difference(token_ids)
+        
+        # Cutoffs end once every token they cover has expired
+        for user_id, (_, expires_at) in list(self._invalidation_cutoffs.items()):
+            if expires_at <= now:
+                del self._invalidation_cutoffs[user_id]
+    
+    def _is_token_invalidated(self, user_id: str, token_id: str, issued_at: int = 0) -> bool:
         """
         Check if a specific token has been invalidated.
         
         Args:
             user_id: User ID from the token
             token_id: Token ID to check
+            issued_at: Issued-at timestamp from the token (default: 0)
         
         Returns:
             True if token is invalidated, False otherwise
         """
-        # If user not in invalidated tokens, token is valid
-        if user_id not in self._invalidated_tokens:
-            return False
+        # A single lookup of the user's current snapshot; no lock needed since
+        # writers replace the frozenset rather than mutating it
+        user_tokens = self._invalidated_tokens.get(user_id, _NO_INVALIDATIONS)
         
         # If "all" is in the set, all tokens for this user are invalidated
-        if "all" in self._invalidated_tokens[user_id]:
+        if "all" in user_tokens or token_id in user_tokens:
             return True
         
-        # Check if specific token ID is invalidated
-        return token_id in self._invalidated_tokens[user_id]
\ No newline at end of file
+        cutoff = self._invalidation_cutoffs.get(user_id)
+        return cutoff is not None and issued_at <= cutoff[0]
\ No newline at end of file
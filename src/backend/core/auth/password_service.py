@@ -3,10 +3,17 @@ Service for secure password management including hashing, verification, policy e
 password history tracking, and reset functionality for the AI writing enhancement platform.
 """
 
+import asyncio  # standard library
 import bcrypt  # bcrypt 4.0.1
+from argon2 import PasswordHasher  # argon2-cffi 23.1.0
+from argon2.exceptions import VerificationError  # argon2-cffi 23.1.0
 import datetime  # standard library
+import hmac  # standard library
+import os  # standard library
+import time  # standard library
+from collections import deque  # standard library
+from concurrent.futures import ThreadPoolExecutor, as_completed  # standard library
 import typing  # standard library
-import uuid  # standard library
 
 from ..utils.logger import get_logger
 from ..utils.validators import is_valid_password
@@ -17,10 +24,38 @@ from ...data.mongodb.repositories.user_repository import UserRepository
 logger = get_logger(__name__)
 
 # Constants
-DEFAULT_BCRYPT_ROUNDS = 12  # Industry standard minimum for security
+ARGON2_TIME_COST = 3  # Argon2id passes over memory
+ARGON2_MEMORY_COST = 65536  # Argon2id memory per hash in KiB (64 MiB)
+ARGON2_PARALLELISM = 4  # Argon2id lanes hashed in parallel per password
+ARGON2_HASH_PREFIX = "$argon2"  # Hashes without this prefix are legacy bcrypt hashes
 PASSWORD_HISTORY_SIZE = 5  # Number of previous passwords to track
 TOKEN_EXPIRY_HOURS = 24  # Reset token validity period
 
+# Worker pool for password hashing; argon2 and bcrypt both release the GIL
+# while hashing, so verifications submitted here run in parallel
+_HASH_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="password-hash")
+
+
+def _expiry_timestamp(expiry: typing.Union[int, float, str, datetime.datetime]) -> float:
+    """Convert a stored reset token expiry to a Unix timestamp
+    
+    Expiries are stored as Unix timestamps; naive UTC datetimes and ISO strings
+    written by earlier versions are still accepted.
+    
+    Args:
+        expiry: Stored expiry value
+        
+    Returns:
+        Expiry as seconds since the epoch
+    """
+    if isinstance(expiry, (int, float)):
+        return expiry
+    if isinstance(expiry, str):
+        expiry = datetime.datetime.fromisoformat(expiry)
+    if expiry.tzinfo is None:
+        expiry = expiry.replace(tzinfo=datetime.timezone.utc)
+    return expiry.timestamp()
+
 
 class PasswordPolicyError(Exception):
     """Error raised when a password doesn't meet policy requirements"""
@@ -81,25 +116,36 @@ class InvalidTokenError(Exception):
 class PasswordService:
     """Service for secure password management with policy enforcement and history tracking"""
     
-    def __init__(self, user_repository: UserRepository, bcrypt_rounds: int = None):
+    __slots__ = ('_user_repository', '_hasher')
+    
+    def __init__(
+        self, 
+        user_repository: UserRepository, 
+        time_cost: int = ARGON2_TIME_COST,
+        memory_cost: int = ARGON2_MEMORY_COST,
+        parallelism: int = ARGON2_PARALLELISM
+    ):
         """Initialize the password service with repository and configuration
         
         Args:
             user_repository: Repository for user data operations
-            bcrypt_rounds: Number of bcrypt hashing rounds (default: DEFAULT_BCRYPT_ROUNDS)
+            time_cost: Argon2id passes over memory (default: ARGON2_TIME_COST)
+            memory_cost: Argon2id memory per hash in KiB (default: ARGON2_MEMORY_COST)
+            parallelism: Argon2id lanes per hash (default: ARGON2_PARALLELISM)
         """
         self._user_repository = user_repository
-        self._bcrypt_rounds = bcrypt_rounds if bcrypt_rounds is not None else DEFAULT_BCRYPT_ROUNDS
-        logger.info(f"PasswordService initialized with {self._bcrypt_rounds} bcrypt rounds")
+        self._hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+        logger.info(f"PasswordService initialized with argon2id (time_cost={time_cost}, "
+                    f"memory_cost={memory_cost}, parallelism={parallelism})")
 
     def hash_password(self, password: str) -> str:
-        """Hash a plaintext password using bcrypt
+        """Hash a plaintext password using argon2id
         
         Args:
             password: Plaintext password to hash
             
         Returns:
-            Bcrypt hash of the password
+            Argon2id hash of the password
             
         Raises:
             PasswordPolicyError: If password doesn't meet policy requirements
@@ -109,18 +155,56 @@ class PasswordService:
             logger.warning("Password policy validation failed")
             raise PasswordPolicyError("Password must be at least 8 characters and include uppercase, lowercase, number, and special character")
         
-        # Generate a salt with the configured number of rounds
-        salt = bcrypt.gensalt(rounds=self._bcrypt_rounds)
-        
-        # Hash the password with the salt
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+        return self._hash_raw(password)
+
+    def _hash_raw(self, password: str) -> str:
+        """Hash a plaintext password using argon2id without policy validation
         
-        # Return the hash as a string
-        hash_str = hashed.decode('utf-8')
+        Args:
+            password: Plaintext password that already passed policy validation
+            
+        Returns:
+            Argon2id hash of the password
+        """
+        # The hasher generates a random salt and encodes parameters in the hash
+        hash_str = self._hasher.hash(password)
         logger.debug("Password hashed successfully")
         
         return hash_str
 
+    def hash_password_pooled(self, password: str) -> str:
+        """Hash a plaintext password on the hashing worker pool and wait for the result
+        
+        Bounds the number of concurrent hashes to the pool size, so simultaneous
+        registrations do not oversubscribe the CPU or argon2id's per-hash memory.
+        Must not be called from a task already running on the pool.
+        
+        Args:
+            password: Plaintext password to hash
+            
+        Returns:
+            Argon2id hash of the password
+            
+        Raises:
+            PasswordPolicyError: If password doesn't meet policy requirements
+        """
+        return _HASH_POOL.submit(self.hash_password, password).result()
+
+    async def hash_password_async(self, password: str) -> str:
+        """Hash a plaintext password on the hashing worker pool without blocking the event loop
+        
+        Args:
+            password: Plaintext password to hash
+            
+        Returns:
+            Argon2id hash of the password
+            
+        Raises:
+            PasswordPolicyError: If password doesn't meet policy requirements
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_HASH_POOL, self.hash_password, password)
+
     def verify_password(self, password: str, password_hash: str) -> bool:
         """Verify a plaintext password against a stored hash
         
@@ -131,16 +215,72 @@ class PasswordService:
         Returns:
             True if password matches hash, False otherwise
         """
-        # Encode inputs for bcrypt
-        password_bytes = password.encode('utf-8')
-        hash_bytes = password_hash.encode('utf-8') if isinstance(password_hash, str) else password_hash
-        
-        # Check if the password matches the hash
-        result = bcrypt.checkpw(password_bytes, hash_bytes)
+        result = self._check_hash(password, password_hash)
         
         logger.debug(f"Password verification {'succeeded' if result else 'failed'}")
         return result
 
+    def _check_hash(self, password: str, password_hash: typing.Union[str, bytes]) -> bool:
+        """Check a password against an argon2id hash or a legacy bcrypt hash
+        
+        Args:
+            password: Plaintext password to check
+            password_hash: Stored hash to verify against
+            
+        Returns:
+            True if password matches hash, False otherwise
+        """
+        if isinstance(password_hash, bytes):
+            password_hash = password_hash.decode('utf-8')
+        
+        if password_hash.startswith(ARGON2_HASH_PREFIX):
+            try:
+                return self._hasher.verify(password_hash, password)
+            except VerificationError:
+                return False
+        
+        # Hashes created before the switch to argon2id are bcrypt hashes
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def needs_rehash(self, password_hash: typing.Union[str, bytes]) -> bool:
+        """Check whether a stored hash should be replaced with a current argon2id hash
+        
+        Args:
+            password_hash: Stored hash to check
+            
+        Returns:
+            True for legacy bcrypt hashes and argon2 hashes with outdated parameters
+        """
+        if isinstance(password_hash, bytes):
+            password_hash = password_hash.decode('utf-8')
+        
+        if not password_hash.startswith(ARGON2_HASH_PREFIX):
+            return True
+        return self._hasher.check_needs_rehash(password_hash)
+
+    def upgrade_hash(self, user_id: str, password: str, password_hash: typing.Union[str, bytes]) -> bool:
+        """Rehash a verified password if its stored hash is legacy or outdated
+        
+        Called after a successful login, while the plaintext password is at hand,
+        so existing bcrypt hashes are migrated to argon2id over time.
+        
+        Args:
+            user_id: User identifier
+            password: Plaintext password that was just verified against password_hash
+            password_hash: Currently stored hash
+            
+        Returns:
+            True if the stored hash was replaced, False otherwise
+        """
+        if not self.needs_rehash(password_hash):
+            return False
+        
+        # The password was accepted when it was set, so policy is not re-applied
+        updated = self._user_repository.update_password(user_id, self._hash_raw(password))
+        if updated:
+            logger.info(f"Password hash upgraded for user: {user_id}")
+        return bool(updated)
+
     def change_password(self, user_id: str, current_password: str, new_password: str) -> bool:
         """Change a user's password with history tracking to prevent reuse
         
@@ -173,23 +313,27 @@ class PasswordService:
             logger.warning(f"New password policy validation failed for user: {user_id}")
             raise PasswordPolicyError("Password must be at least 8 characters and include uppercase, lowercase, number, and special character")
         
-        # Check if new password is in password history
-        if self.check_password_history(user_id, new_password):
-            logger.warning(f"New password found in history for user: {user_id}")
+        # Reusing the current password is rejected without any hashing work,
+        # since it was just verified above
+        if new_password == current_password:
+            logger.warning(f"New password matches current password for user: {user_id}")
             raise PasswordHistoryError()
         
-        # Hash the new password
-        new_hash = self.hash_password(new_password)
-        
         # Get or initialize password history
         password_history = user.get('passwordHistory', [])
         
-        # Add current password hash to history before updating
-        password_history.append(user['passwordHash'])
+        # Check if new password is in password history (already loaded with the user)
+        if self._is_in_password_history(new_password, password_history):
+            logger.warning(f"New password found in history for user: {user_id}")
+            raise PasswordHistoryError()
+        
+        # Hash the new password (policy was validated above)
+        new_hash = self._hash_raw(new_password)
         
-        # Keep only the most recent passwords up to PASSWORD_HISTORY_SIZE
-        if len(password_history) > PASSWORD_HISTORY_SIZE:
-            password_history = password_history[-PASSWORD_HISTORY_SIZE:]
+        # Add current password hash to history before updating; the bounded
+        # deque keeps only the most recent PASSWORD_HISTORY_SIZE hashes
+        password_history = deque(password_history, maxlen=PASSWORD_HISTORY_SIZE)
+        password_history.append(user['passwordHash'])
         
         # Update the user's password hash
         update_succeeded = self._user_repository.update_password(user_id, new_hash)
@@ -227,8 +371,8 @@ class PasswordService:
         # Generate a secure random token
         token = generate_token()
         
-        # Calculate token expiry time
-        expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=TOKEN_EXPIRY_HOURS)
+        # Calculate token expiry time as a Unix timestamp
+        expiry = int(time.time()) + TOKEN_EXPIRY_HOURS * 3600
         
         # Store the token and expiry in the user record
         stored = self._user_repository.store_reset_token(user_id, token, expiry)
@@ -236,7 +380,7 @@ class PasswordService:
             logger.error(f"Failed to store reset token for user: {user_id}")
             raise Exception("Failed to create password reset token")
         
-        logger.info(f"Created password reset token for user: {user_id}, expires: {expiry.isoformat()}")
+        logger.info(f"Created password reset token for user: {user_id}, expires: {expiry}")
         return token
 
     def validate_reset_token(self, user_id: str, token: str) -> bool:
@@ -260,15 +404,15 @@ class PasswordService:
             logger.warning(f"No reset token found for user: {user_id}")
             return False
         
-        # Check if the token matches
-        if user['resetToken'] != token:
+        # Check if the token matches, in constant time to avoid leaking it through timing
+        if not token or not hmac.compare_digest(user['resetToken'].encode('utf-8'), token.encode('utf-8')):
             logger.warning(f"Invalid reset token provided for user: {user_id}")
             return False
         
         # Check if the token has expired
-        token_expiry = datetime.datetime.fromisoformat(user['resetTokenExpiry'])
-        if token_expiry < datetime.datetime.utcnow():
-            logger.warning(f"Expired reset token for user: {user_id}, expired: {token_expiry.isoformat()}")
+        token_expiry = _expiry_timestamp(user['resetTokenExpiry'])
+        if token_expiry < time.time():
+            logger.warning(f"Expired reset token for user: {user_id}, expired: {token_expiry}")
             return False
         
         logger.debug(f"Reset token validated successfully for user: {user_id}")
@@ -299,8 +443,8 @@ class PasswordService:
             logger.warning(f"New password policy validation failed for user: {user_id}")
             raise PasswordPolicyError("Password must be at least 8 characters and include uppercase, lowercase, number, and special character")
         
-        # Hash the new password
-        new_hash = self.hash_password(new_password)
+        # Hash the new password (policy was validated above)
+        new_hash = self._hash_raw(new_password)
         
         # Update the user's password hash
         update_succeeded = self._user_repository.update_password(user_id, new_hash)
@@ -336,11 +480,39 @@ class PasswordService:
         # Get the password history
         password_history = user.get('passwordHistory', [])
         
-        # Check each hash in the history
-        for hash_value in password_history:
-            if self.verify_password(password, hash_value):
-                logger.info(f"Password found in history for user: {user_id}")
-                return True
+        if self._is_in_password_history(password, password_history):
+            logger.info(f"Password found in history for user: {user_id}")
+            return True
         
         logger.debug(f"Password not found in history for user: {user_id}")
+        return False
+
+    def _is_in_password_history(self, password: str, password_history: list) -> bool:
+        """Check a password against a list of previous password hashes
+        
+        Args:
+            password: Password to check
+            password_history: Previous argon2id or legacy bcrypt hashes
+            
+        Returns:
+            True if password matches any hash in the history, False otherwise
+        """
+        if not password_history:
+            return False
+        
+        # A single hash gains nothing from the pool; check it inline
+        if len(password_history) == 1:
+            return self._check_hash(password, password_history[0])
+        
+        # Check the history hashes in parallel, stopping at the first match
+        futures = [
+            _HASH_POOL.submit(self._check_hash, password, hash_value)
+            for hash_value in password_history
+        ]
+        for future in as_completed(futures):
+            if future.result():
+                for pending in futures:
+                    pending.cancel()
+                return True
+        
         return False
\ No newline at end of file
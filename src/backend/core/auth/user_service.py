@@ -2,7 +2,12 @@
 Provides comprehensive user management functionality for the AI writing enhancement platform, supporting both anonymous and authenticated users. This service acts as a high-level abstraction over user operations, including registration, authentication, profile management, and the transition from anonymous to authenticated sessions.
 """
 
-import uuid  # standard library
+import asyncio  # standard library
+import secrets  # standard library
+import threading  # standard library
+import time  # standard library
+from collections import OrderedDict  # standard library
+from concurrent.futures import ThreadPoolExecutor  # standard library
 from datetime import datetime  # standard library
 import typing  # standard library
 
@@ -19,6 +24,92 @@ logger = get_logger(__name__)
 
 # Constants
 EMAIL_VERIFICATION_EXPIRY_HOURS = 24  # Email verification token expiry time
+USER_CACHE_SIZE = 10000  # Max number of cached user lookups
+USER_CACHE_TTL = 60  # Seconds a cached user lookup may be served
+
+# Worker pool for repository and session writes run off the request thread
+_BACKGROUND_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="user-service")
+
+
+class _UserCache:
+    """
+    Process-local LRU cache of user documents with a TTL, keyed by lookup
+    (e.g. ("id", user_id) or ("email", email)) and invalidated per user.
+    """
+
+    __slots__ = ('_entries', '_keys_by_user', '_lock', '_max_size', '_ttl')
+
+    def __init__(self, max_size: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL):
+        """
+        Initialize an empty cache
+
+        Args:
+            max_size: Max number of cached lookups
+            ttl: Seconds a cached lookup may be served
+        """
+        self._entries = OrderedDict()  # lookup key -> (expires_at, user_id, user)
+        self._keys_by_user = {}  # user_id -> set of lookup keys
+        self._lock = threading.Lock()
+        self._max_size = max_size
+        self._ttl = ttl
+
+    def get(self, key: tuple) -> typing.Optional[dict]:
+        """
+        Get a cached user document
+
+        Args:
+            key: Lookup key
+
+        Returns:
+            Copy of the cached user, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return dict(entry[2])
+
+    def put(self, key: tuple, user: dict) -> None:
+        """
+        Cache a user document, without its password hash
+
+        Args:
+            key: Lookup key
+            user: User document as returned by the repository
+        """
+        user_id = str(user.get("_id"))
+        user = {k: v for k, v in user.items() if k != "passwordHash"}
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self._ttl, user_id, user)
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self._max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, user_id: str) -> None:
+        """
+        Drop every cached lookup of a user
+
+        Args:
+            user_id: User's ID string
+        """
+        with self._lock:
+            for key in self._keys_by_user.pop(str(user_id), ()):
+                self._entries.pop(key, None)
+
+    def _remove(self, key: tuple) -> None:
+        """Remove one lookup key; the caller holds the lock"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            user_keys = self._keys_by_user.get(entry[1])
+            if user_keys is not None:
+                user_keys.discard(key)
+                if not user_keys:
+                    del self._keys_by_user[entry[1]]
 
 
 class UserService:
@@ -26,6 +117,14 @@ class UserService:
     Core service for user management operations including authentication, registration, and profile management
     """
 
+    # Profile fields that users may update themselves
+    _ALLOWED_PROFILE_FIELDS = frozenset({"firstName", "lastName", "preferences"})
+
+    # User fields fetched for login and returned with the tokens (plus _id)
+    _AUTHENTICATION_FIELDS = frozenset({
+        "email", "firstName", "lastName", "emailVerified", "accountStatus", "lastLogin"
+    })
+
     def __init__(
         self,
         user_repository: UserRepository,
@@ -48,6 +147,14 @@ class UserService:
         self._password_service = password_service
         self._anonymous_session_manager = anonymous_session_manager
 
+        # Read-through cache for user lookups; every write below invalidates it
+        self._user_cache = _UserCache()
+
+        # Argon2id hash of a random password, created on first use and verified against
+        # when a login has no stored hash, so that failed logins cost the same whether
+        # or not the user exists
+        self._dummy_hash = None
+
         # Initialize logger for user operations
         logger.info("UserService initialized")
 
@@ -63,6 +170,45 @@ class UserService:
         Returns:
             Newly created user data and authentication tokens
         """
+        self._validate_credentials(email, password)
+        self._ensure_email_available(email)
+
+        # Hash the password on the password service's bounded worker pool
+        password_hash = self._password_service.hash_password_pooled(password)
+
+        return self._create_registered_user(email, password_hash, profile_data)
+
+    async def register_user_async(self, email: str, password: str, profile_data: dict) -> dict:
+        """
+        Registers a new user without blocking the event loop on hashing or database writes
+
+        Args:
+            email: User's email address
+            password: User's password
+            profile_data: Dictionary containing additional profile information
+
+        Returns:
+            Newly created user data and authentication tokens
+        """
+        self._validate_credentials(email, password)
+        self._ensure_email_available(email)
+
+        # Hash the password on the password service's worker pool
+        password_hash = await self._password_service.hash_password_async(password)
+
+        # Create the user on the default executor; the user-service pool is not used
+        # here since _create_registered_user itself waits on tasks submitted to it
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._create_registered_user, email, password_hash, profile_data)
+
+    def _validate_credentials(self, email: str, password: str) -> None:
+        """
+        Validates the email format and password strength for registration
+
+        Args:
+            email: User's email address
+            password: User's password
+        """
         # Validate email format using is_valid_email
         if not is_valid_email(email):
             logger.warning(f"Invalid email format provided: {email}")
@@ -73,30 +219,58 @@ class UserService:
             logger.warning("Password does not meet strength requirements")
             raise ValueError("Password must be at least 8 characters and include uppercase, lowercase, number, and special character")
 
-        # Hash the password using password_service
-        password_hash = self._password_service.hash_password(password)
+    def _ensure_email_available(self, email: str) -> None:
+        """
+        Fails fast on an already registered email, before any password hashing
+
+        The repository's own check and unique index still cover concurrent registrations.
+
+        Args:
+            email: User's email address
+        """
+        if self._user_repository.email_exists(email):
+            logger.warning(f"Registration attempted with existing email: {email}")
+            raise DuplicateEmailError(email)
+
+    def _create_registered_user(self, email: str, password_hash: str, profile_data: dict) -> dict:
+        """
+        Creates the user record for a registration and issues its tokens
 
+        Args:
+            email: User's email address
+            password_hash: Hash of the user's password
+            profile_data: Dictionary containing additional profile information
+
+        Returns:
+            Newly created user data and authentication tokens
+        """
         # Prepare user data with email, password_hash and profile information
-        user_data = {
-            "email": email,
-            "password_hash": password_hash,
-            **profile_data
-        }
+        user_data = profile_data.copy()
+        user_data["email"] = email
+        user_data["password_hash"] = password_hash
 
         # Create user record in the database via user_repository
         user = self._user_repository.create_user(user_data)
 
+        user_id = str(user["_id"])
+
+        # Store the email verification token while the auth tokens are created
+        verification_future = _BACKGROUND_POOL.submit(self.generate_email_verification, user_id)
+
         # Generate authentication tokens using jwt_service
-        auth_tokens = self._jwt_service.create_token_pair(str(user["_id"]))
+        auth_tokens = self._jwt_service.create_token_pair(user_id)
 
-        # Generate email verification token
-        verification_token = self.generate_email_verification(str(user["_id"]))
+        # Wait for the verification token; failures propagate as before
+        verification_token = verification_future.result()
 
         # Log successful registration with sanitized info
-        logger.info(f"User registered successfully: {email}", user_id=str(user["_id"]))
+        logger.info(f"User registered successfully: {email}", user_id=user_id)
 
-        # Return user data with auth tokens
-        return {**user, **auth_tokens}
+        # Return user data with auth tokens, never the password hash
+        user.pop("passwordHash", None)
+        user.pop("password_hash", None)
+        user.update(auth_tokens)
+        return user
 
     def authenticate_user(self, email: str, password: str) -> dict:
         """
@@ -109,30 +283,80 @@ class UserService:
         Returns:
             User data and authentication tokens if successful
         """
-        # Retrieve user by email from user_repository
-        user = self._user_repository.get_by_email(email, include_password_hash=True)
+        # Retrieve user by email, fetching only the fields the login response needs
+        user = self._user_repository.get_by_email(
+            email, include_password_hash=True, fields=self._AUTHENTICATION_FIELDS
+        )
 
-        # If user not found, raise AuthenticationError
+        # If user not found, verify against the dummy hash anyway so the response
+        # time does not reveal whether the email is registered
         if not user:
+            self._verify_dummy_hash(password)
             logger.warning(f"Authentication failed: User not found with email {email}")
             raise AuthenticationError("Invalid credentials")
 
         # Verify password using password_service
-        if 'passwordHash' not in user or not self._password_service.verify_password(password, user['passwordHash']):
+        if 'passwordHash' not in user:
+            self._verify_dummy_hash(password)
+            logger.warning(f"Authentication failed: No password set for user {email}")
+            raise AuthenticationError("Invalid credentials")
+        if not self._password_service.verify_password(password, user['passwordHash']):
             logger.warning(f"Authentication failed: Invalid password for user {email}")
             raise AuthenticationError("Invalid credentials")
 
-        # Update last login timestamp
-        self._user_repository.update_last_login(str(user["_id"]))
+        user_id = str(user["_id"])
+
+        # Record the login in the background; the response does not wait for these writes
+        _BACKGROUND_POOL.submit(self._record_login, user_id, password, user['passwordHash'])
 
         # Generate authentication tokens using jwt_service
-        auth_tokens = self._jwt_service.create_token_pair(str(user["_id"]))
+        auth_tokens = self._jwt_service.create_token_pair(user_id)
 
         # Log successful authentication (without exposing credentials)
-        logger.info(f"User authenticated successfully: {email}", user_id=str(user["_id"]))
+        logger.info(f"User authenticated successfully: {email}", user_id=user_id)
+
+        # Return user data with auth tokens, never the password hash
+        user.pop("passwordHash", None)
+        user.pop("password_hash", None)
+        user.update(auth_tokens)
+        return user
+
+    def _verify_dummy_hash(self, password: str) -> None:
+        """
+        Verifies a password against the argon2id dummy hash
 
-        # Return user data with auth tokens
-        return {**user, **auth_tokens}
+        Argon2id matches every new and active user's stored hash; users who have not
+        logged in since the switch from bcrypt keep a cheaper hash until they do.
+
+        Args:
+            password: Password submitted with the failed login
+        """
+        if self._dummy_hash is None:
+            self._dummy_hash = self._password_service.hash_password(secrets.token_hex(16) + "Aa1!")
+        self._password_service.verify_password(password, self._dummy_hash)
+
+    def _record_login(self, user_id: str, password: str, password_hash: str) -> None:
+        """
+        Performs the writes that follow a successful login
+
+        Args:
+            user_id: User's ID string
+            password: Password that was just verified
+            password_hash: Stored hash the password was verified against
+        """
+        # Migrate legacy or outdated password hashes while the password is at hand
+        try:
+            self._password_service.upgrade_hash(user_id, password, password_hash)
+        except Exception as e:
+            logger.warning(f"Failed to upgrade password hash for user {user_id}: {str(e)}")
+
+        # Update last login timestamp
+        try:
+            self._user_repository.update_last_login(user_id)
+        except Exception as e:
+            logger.warning(f"Failed to update last login for user {user_id}: {str(e)}")
+        finally:
+            self._user_cache.invalidate(user_id)
 
     def refresh_auth_token(self, refresh_token: str, user_id: str) -> dict:
         """
@@ -175,8 +399,8 @@ class UserService:
             logger.warning("User ID cannot be empty")
             raise ValueError("User ID cannot be empty")
 
-        # Retrieve user by ID from user_repository
-        user = self._user_repository.get_by_id(user_id)
+        # Retrieve user by ID, from the cache when possible
+        user = self._get_cached_user(("id", user_id), self._user_repository.get_by_id, user_id)
 
         # If user not found, raise UserNotFoundError
         if not user:
@@ -205,11 +429,12 @@ class UserService:
         # Filter profile_data to prevent updating restricted fields
         safe_profile_data = {
             k: v for k, v in profile_data.items()
-            if k in ["firstName", "lastName", "preferences"]  # Allowed fields
+            if k in self._ALLOWED_PROFILE_FIELDS
         }
 
         # Update user via user_repository
         updated_user = self._user_repository.update_user(user_id, safe_profile_data)
+        self._user_cache.invalidate(user_id)
 
         # Return updated user data
         return updated_user
@@ -233,6 +458,7 @@ class UserService:
 
         # Change password using password_service
         change_result = self._password_service.change_password(user_id, current_password, new_password)
+        self._user_cache.invalidate(user_id)
 
         # Log password change (without exposing passwords)
         logger.info(f"Password changed successfully for user: {user_id}")
@@ -255,8 +481,8 @@ class UserService:
             logger.warning(f"Invalid email format provided: {email}")
             raise ValueError("Invalid email format")
 
-        # Retrieve user by email from repository
-        user = self._user_repository.get_by_email(email)
+        # Retrieve user by email, from the cache when possible
+        user = self._get_cached_user(("email", email), self._user_repository.get_by_email, email)
 
         # If user not found, raise UserNotFoundError
         if not user:
@@ -264,13 +490,14 @@ class UserService:
             raise UserNotFoundError(email)
 
         # Generate reset token using password_service
-        reset_token = self._password_service.create_reset_token(str(user["_id"]))
+        user_id = str(user["_id"])
+        reset_token = self._password_service.create_reset_token(user_id)
 
         # Log reset request (without exposing the token)
-        logger.info(f"Password reset requested for user: {email}", user_id=str(user["_id"]))
+        logger.info(f"Password reset requested for user: {email}", user_id=user_id)
 
         # Return user data with reset token
-        return {"user_id": str(user["_id"]), "reset_token": reset_token}
+        return {"user_id": user_id, "reset_token": reset_token}
 
     def reset_password(self, user_id: str, token: str, new_password: str) -> bool:
         """
@@ -291,6 +518,7 @@ class UserService:
 
         # Reset password using password_service
         reset_result = self._password_service.reset_password(user_id, token, new_password)
+        self._user_cache.invalidate(user_id)
 
         # Log password reset (without exposing password)
         logger.info(f"Password reset successfully for user: {user_id}")
@@ -313,20 +541,20 @@ class UserService:
             logger.warning("User ID cannot be empty")
             raise ValueError("User ID cannot be empty")
 
-        # Generate unique verification token using uuid
-        verification_token = str(uuid.uuid4())
+        # Generate unique verification token (64 hex characters from the OS CSPRNG)
+        verification_token = secrets.token_hex(32)
 
         # Calculate expiration time (current time + EMAIL_VERIFICATION_EXPIRY_HOURS)
-        expiry = datetime.utcnow() + datetime.timedelta(hours=EMAIL_VERIFICATION_EXPIRY_HOURS)
+        expiry_timestamp = int(time.time()) + EMAIL_VERIFICATION_EXPIRY_HOURS * 3600
+        expiry = datetime.utcfromtimestamp(expiry_timestamp)
 
         # Store token and expiry in user record
         stored = self._user_repository.store_verification_token(user_id, verification_token, expiry)
         if not stored:
-            logger.error(f"Failed to store verification token for user: {user_id}")
-            raise Exception("Failed to create email verification token")
+            raise EmailVerificationError(f"Failed to create email verification token for user: {user_id}")
 
         # Log token generation (without exposing the token)
-        logger.info(f"Email verification token generated for user: {user_id}, expires: {expiry.isoformat()}")
+        logger.info("Email verification token generated for user: %s, expires: %d", user_id, expiry_timestamp)
 
         # Return the verification token
         return verification_token
@@ -349,6 +577,7 @@ class UserService:
 
         # Verify email using user_repository
         verified = self._user_repository.verify_email(user_id)
+        self._user_cache.invalidate(user_id)
 
         # Log successful verification
         logger.info(f"Email verified successfully for user: {user_id}")
@@ -356,7 +585,9 @@ class UserService:
         # Return success status
         return verified
 
-    def logout_user(self, user_id: str, token_id: str = None, all_devices: bool = False) -> bool:
+    def logout_user(
+        self, user_id: str, token_id: str = None, all_devices: bool = False, expires_at: int = None
+    ) -> bool:
         """
         Logs out a user by invalidating their tokens
 
@@ -364,6 +595,8 @@ class UserService:
             user_id: User's ID string
             token_id: ID of the token to invalidate (optional)
             all_devices: Whether to invalidate all tokens for the user
+            expires_at: Expiry timestamp of the token (optional); lets its invalidation
+                        be dropped once the token has expired
 
         Returns:
             True if logout was successful
@@ -373,8 +606,12 @@ class UserService:
             logger.warning("User ID cannot be empty")
             raise ValueError("User ID cannot be empty")
 
-        # Invalidate tokens using jwt_service
-        self._jwt_service.invalidate_tokens(user_id, [token_id] if token_id else None, all_devices)
+        # Invalidate tokens using jwt_service; with neither a token nor all devices
+        # there is nothing to revoke, and stateless tokens simply expire
+        if all_devices:
+            self._jwt_service.invalidate_tokens(user_id, invalidate_all=True)
+        elif token_id:
+            self._jwt_service.invalidate_tokens(user_id, (token_id,), expires_at=expires_at)
 
         # Log logout action
         logger.info(f"User logged out: {user_id}, all_devices: {all_devices}")
@@ -419,43 +656,44 @@ class UserService:
         Returns:
             Registered user data and authentication tokens
         """
-        # Validate email format
-        if not is_valid_email(email):
-            logger.warning(f"Invalid email format provided: {email}")
-            raise ValueError("Invalid email format")
-
-        # Validate password strength
-        if not is_valid_password(password):
-            logger.warning("Password does not meet strength requirements")
-            raise ValueError("Password must be at least 8 characters and include uppercase, lowercase, number, and special character")
+        self._validate_credentials(email, password)
+        self._ensure_email_available(email)
 
-        # Hash the password using password_service
-        password_hash = self._password_service.hash_password(password)
+        # Hash the password on the password service's bounded worker pool
+        password_hash = self._password_service.hash_password_pooled(password)
 
         # Prepare user data with email, password_hash and profile information
-        user_data = {
-            "email": email,
-            "password_hash": password_hash,
-            **profile_data
-        }
+        user_data = profile_data.copy()
+        user_data["email"] = email
+        user_data["password_hash"] = password_hash
 
         # Convert anonymous user to registered via user_repository
         registered_user = self._user_repository.convert_anonymous_to_registered(session_id, user_data)
+        user_id = str(registered_user["_id"])
+        self._user_cache.invalidate(user_id)
 
-        # Upgrade anonymous session to authenticated session
-        self._anonymous_session_manager.upgrade_to_authenticated_user(session_id, str(registered_user["_id"]))
+        # The session upgrade, token creation and verification token are independent;
+        # run the session and repository writes concurrently with token creation
+        upgrade_future = _BACKGROUND_POOL.submit(
+            self._anonymous_session_manager.upgrade_to_authenticated_user, user_id, session_id
+        )
+        verification_future = _BACKGROUND_POOL.submit(self.generate_email_verification, user_id)
 
         # Generate authentication tokens using jwt_service
-        auth_tokens = self._jwt_service.create_token_pair(str(registered_user["_id"]))
+        auth_tokens = self._jwt_service.create_token_pair(user_id)
 
-        # Generate email verification token
-        verification_token = self.generate_email_verification(str(registered_user["_id"]))
+        # Wait for both writes; failures propagate as before
+        upgrade_future.result()
+        verification_token = verification_future.result()
 
         # Log successful conversion
         logger.info(f"Anonymous user converted to registered user: {email}")
 
-        # Return registered user data with auth tokens
-        return {**registered_user, **auth_tokens}
+        # Return registered user data with auth tokens, never the password hash
+        registered_user.pop("passwordHash", None)
+        registered_user.pop("password_hash", None)
+        registered_user.update(auth_tokens)
+        return registered_user
 
     def get_user_by_session(self, session_id: str) -> dict:
         """
@@ -472,8 +710,8 @@ class UserService:
             logger.warning("Session ID cannot be empty")
             raise ValueError("Session ID cannot be empty")
 
-        # Retrieve user by session ID from user_repository
-        user = self._user_repository.get_by_session(session_id)
+        # Retrieve user by session ID, from the cache when possible
+        user = self._get_cached_user(("session", session_id), self._user_repository.get_by_session, session_id)
 
         # If user not found, raise UserNotFoundError
         if not user:
@@ -500,6 +738,7 @@ class UserService:
 
         # Delete user via user_repository
         deleted = self._user_repository.delete_user(user_id)
+        self._user_cache.invalidate(user_id)
 
         # Invalidate all tokens for the user
         self._jwt_service.invalidate_tokens(user_id, invalidate_all=True)
@@ -528,6 +767,7 @@ class UserService:
 
         # Update user preferences via user_repository
         updated_preferences = self._user_repository.update_user_preferences(user_id, preferences)
+        self._user_cache.invalidate(user_id)
 
         # Log preferences update
         logger.info(f"Preferences updated for user: {user_id}")
@@ -535,12 +775,33 @@ class UserService:
         # Return updated preferences data
         return updated_preferences
 
+    def _get_cached_user(self, key: tuple, loader: typing.Callable[[str], typing.Optional[dict]], value: str) -> typing.Optional[dict]:
+        """
+        Look up a user in the cache, loading and caching it from the repository on a miss
+
+        Args:
+            key: Cache lookup key
+            loader: Repository method to load the user with
+            value: Argument for the loader
+
+        Returns:
+            User data, or None if the repository has no such user
+        """
+        user = self._user_cache.get(key)
+        if user is None:
+            user = loader(value)
+            if user:
+                self._user_cache.put(key, user)
+        return user
+
 
 class AuthenticationError(Exception):
     """
     Exception raised when authentication fails
     """
 
+    __slots__ = ()
+
     def __init__(self, message: str = None):
         """
         Initialize authentication error with message
@@ -560,6 +821,8 @@ class UserNotFoundError(Exception):
     Exception raised when a user cannot be found
     """
 
+    __slots__ = ("user_id",)
+
     def __init__(self, user_id: str, message: str = None):
         """
         Initialize user not found error with user ID and message
@@ -582,6 +845,8 @@ class InvalidTokenError(Exception):
     Exception raised when a token is invalid or expired
     """
 
+    __slots__ = ()
+
     def __init__(self, message: str = None):
         """
         Initialize invalid token error with message
@@ -601,6 +866,8 @@ class EmailVerificationError(Exception):
     Exception raised when email verification fails
     """
 
+    __slots__ = ()
+
     def __init__(self, message: str = None):
         """
         Initialize email verification error with message
@@ -4,13 +4,29 @@ enabling comparison between original document content and AI-suggested improveme
 output formats and visualization options.
 """
 
-import difflib  # standard library
+import functools  # standard library
+import itertools  # standard library
 import json  # standard library
+import operator  # standard library
+import os  # standard library
 import re  # standard library
+import sys  # standard library
 import typing  # standard library
 import uuid  # standard library
 from diff_match_patch import diff_match_patch  # diff-match-patch ~=1.0.5
 
+# Prefer the compiled drop-in unified_diff (identical output); fall back to the standard library
+try:
+    from difflib_rs import unified_diff  # difflib-rs ~=0.1.1
+except ImportError:
+    from difflib import unified_diff  # standard library
+
+# Prefer the C-accelerated SequenceMatcher (identical opcodes); fall back to the standard library
+try:
+    from cdifflib import CSequenceMatcher as SequenceMatcher  # cdifflib ~=1.2.9
+except ImportError:
+    from difflib import SequenceMatcher  # standard library
+
 from ..utils.logger import get_logger
 
 # Configure logging
@@ -33,6 +49,19 @@ TRACK_CHANGES_MARKERS = {
     "addition_suffix": "+}"
 }
 
+# Precompiled patterns for whitespace normalization and default word tokenization
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_WORD_PATTERN = re.compile(r'\b\w+\b|\s+|[^\w\s]')
+# Original-side range of a unified diff hunk header, e.g. "@@ -12,4 +12,5 @@"
+_HUNK_HEADER_PATTERN = re.compile(r'^@@ -(\d+)(?:,(\d+))?')
+
+# Texts whose line lists are kept, so unified formatting reuses the lines split for its diff
+LINE_SPLIT_CACHE_SIZE = 4
+
+# Largest edit distance (in tokens) the word-level Myers diff explores before falling back
+# to SequenceMatcher; its snapshots grow quadratically with the edit distance
+MYERS_MAX_EDIT_DISTANCE = 1000
+
 
 class DiffServiceError(Exception):
     """Base exception class for diff service errors"""
@@ -83,6 +112,57 @@ class UnsupportedFormatError(DiffServiceError):
         self.format = format
 
 
+def _strip_affixes(a: typing.Sequence, b: typing.Sequence) -> tuple:
+    """
+    Internal function splitting off the common prefix and suffix of two sequences
+    
+    Args:
+        a: Original text or token sequence
+        b: Modified text or token sequence
+        
+    Returns:
+        Tuple of (prefix_len, a_middle, b_middle, suffix_len)
+    """
+    # Binary search on slice equality, which compares in C for both strings and lists
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[:mid] == b[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    prefix_len = low
+    
+    # The suffix may not overlap the prefix
+    low, high = 0, min(len(a), len(b)) - prefix_len
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[len(a) - mid:] == b[len(b) - mid:]:
+            low = mid
+        else:
+            high = mid - 1
+    suffix_len = low
+    
+    return prefix_len, a[prefix_len:len(a) - suffix_len], b[prefix_len:len(b) - suffix_len], suffix_len
+
+
+@functools.lru_cache(maxsize=LINE_SPLIT_CACHE_SIZE)
+def _split_lines(text: str) -> tuple:
+    """
+    Internal function splitting a text into lines that keep their line breaks
+    
+    Cached so that formatting a unified diff reuses the lines already split while
+    generating it, instead of splitting the same texts again.
+    
+    Args:
+        text: Text content
+        
+    Returns:
+        Tuple of lines, each with its line break
+    """
+    return tuple(text.splitlines(True))
+
+
 def _generate_diff_match_patch(original_text: str, modified_text: str, options: dict) -> list:
     """
     Internal function implementing diff-match-patch algorithm for text comparison
@@ -92,7 +172,8 @@ def _generate_diff_match_patch(original_text: str, modified_text: str, options:
         modified_text: Modified text content
         options: Algorithm options including:
             - cleanup_semantic: Whether to perform semantic cleanup
-            - cleanup_efficiency: Whether to perform efficiency cleanup
+            - cleanup_efficiency: Whether to perform efficiency cleanup (default False; track
+              changes displays every edit, so merging short edits only loses granularity)
             - case_sensitive: Whether comparison should be case sensitive
             - ignore_whitespace: Whether to ignore whitespace changes
             
@@ -108,8 +189,8 @@ def _generate_diff_match_patch(original_text: str, modified_text: str, options:
         modified_text = modified_text.lower()
     
     if options.get("ignore_whitespace", False) is True:
-        original_text = re.sub(r'\s+', ' ', original_text).strip()
-        modified_text = re.sub(r'\s+', ' ', modified_text).strip()
+        original_text = _WHITESPACE_PATTERN.sub(' ', original_text).strip()
+        modified_text = _WHITESPACE_PATTERN.sub(' ', modified_text).strip()
     
     # Generate diff
     diffs = dmp.diff_main(original_text, modified_text)
@@ -118,7 +199,7 @@ def _generate_diff_match_patch(original_text: str, modified_text: str, options:
     if options.get("cleanup_semantic", True):
         dmp.diff_cleanupSemantic(diffs)
     
-    if options.get("cleanup_efficiency", True):
+    if options.get("cleanup_efficiency", False):
         dmp.diff_cleanupEfficiency(diffs)
     
     # Process diff operations to structured format
@@ -163,21 +244,21 @@ def _generate_unified_diff(original_text: str, modified_text: str, options: dict
         List of diff operations with line-based changes
     """
     # Split texts into lines
-    original_lines = original_text.splitlines(True)
-    modified_lines = modified_text.splitlines(True)
+    original_lines = _split_lines(original_text)
+    modified_lines = _split_lines(modified_text)
     
     # Get context lines option (default to 3)
     context_lines = options.get("context_lines", 3)
     
-    # Generate unified diff
-    diff_generator = difflib.unified_diff(
+    # Generate unified diff (difflib-rs returns a list, so iterate explicitly)
+    diff_generator = iter(unified_diff(
         original_lines,
         modified_lines,
         fromfile=options.get("from_file", "original"),
         tofile=options.get("to_file", "modified"),
         n=context_lines,
         lineterm=""
-    )
+    ))
     
     # Parse unified diff into structured format
     result = []
@@ -189,9 +270,16 @@ def _generate_unified_diff(original_text: str, modified_text: str, options: dict
         next(diff_generator, None)  # from_file
         next(diff_generator, None)  # to_file
     
-        # Skip chunk header if present
         for line in diff_generator:
             if line.startswith("@@"):
+                # Chunk header: move to the hunk's first original line; an empty range names the line before it
+                match = _HUNK_HEADER_PATTERN.match(line)
+                if match:
+                    hunk_start = int(match.group(1))
+                    if match.group(2) != "0":
+                        hunk_start -= 1
+                    char_position += sum(map(len, original_lines[line_position:hunk_start]))
+                    line_position = hunk_start
                 continue
             
             if line.startswith("-"):
@@ -225,7 +313,7 @@ def _generate_unified_diff(original_text: str, modified_text: str, options: dict
                     "length": len(line),
                     "line": line_position
                 }
-                char_position += len(line)
+                char_position += len(line) - 1  # Text keeps the leading space
                 line_position += 1
                 result.append(operation)
     except Exception as e:
@@ -233,12 +321,146 @@ def _generate_unified_diff(original_text: str, modified_text: str, options: dict
     
     logger.debug("Generated diff with unified diff algorithm", 
                 result_count=len(result),
+                original_length=len(original_text),
                 original_lines=len(original_lines),
                 modified_lines=len(modified_lines))
     
     return result
 
 
+def _myers_opcodes(a: list, b: list, max_edit_distance: int = MYERS_MAX_EDIT_DISTANCE) -> typing.Optional[list]:
+    """
+    Internal function computing a minimal edit script with the forward Myers O(ND) algorithm
+    
+    Args:
+        a: Original token sequence
+        b: Modified token sequence
+        max_edit_distance: Edit distance after which the search is abandoned
+        
+    Returns:
+        List of (tag, i1, i2, j1, j2) opcodes shaped like SequenceMatcher.get_opcodes(),
+        or None if the edit distance exceeds max_edit_distance
+    """
+    n = len(a)
+    m = len(b)
+    max_d = min(n + m, max_edit_distance)
+    
+    # Furthest reaching x for each diagonal k, stored at index k + offset
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    
+    # Snapshots of v for every completed round, flattened into a single list: round d holds
+    # diagonals -d..d (step 2) starting at trace_starts[d]
+    trace = []
+    trace_starts = []
+    
+    for d in range(max_d + 1):
+        # Walk the diagonals by their index into v (k + offset) to keep the hot loop lean
+        lowest = offset - d
+        highest = offset + d
+        for index in range(lowest, highest + 1, 2):
+            if index == lowest or (index != highest and v[index - 1] < v[index + 1]):
+                x = v[index + 1]  # Step down: insertion
+            else:
+                x = v[index - 1] + 1  # Step right: deletion
+            y = x - index + offset
+            
+            # Follow the diagonal of equal tokens
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            
+            v[index] = x
+            
+            if x >= n and y >= m:
+                break
+        else:
+            # Snapshot the round with one slice; the final round is never needed for backtracking
+            trace_starts.append(len(trace))
+            trace.extend(v[lowest:highest + 1:2])
+            continue
+        break
+    else:
+        return None
+    
+    # Backtrack through the snapshots, collecting the runs of equal tokens
+    matches = []
+    x, y = n, m
+    for d in range(d, 0, -1):
+        k = x - y
+        prev_start = trace_starts[d - 1]
+        if k == -d or (k != d and trace[prev_start + (k + d - 2) // 2] < trace[prev_start + (k + d) // 2]):
+            prev_k = k + 1
+            snake_x = trace[prev_start + (prev_k + d - 1) // 2]
+        else:
+            prev_k = k - 1
+            snake_x = trace[prev_start + (prev_k + d - 1) // 2] + 1
+        
+        if x > snake_x:
+            matches.append((snake_x, snake_x - k, x - snake_x))
+        
+        x = trace[prev_start + (prev_k + d - 1) // 2]
+        y = x - prev_k
+    
+    if x > 0:
+        matches.append((0, 0, x))
+    
+    matches.reverse()
+    
+    # Convert the equal runs and the gaps between them into opcodes
+    opcodes = []
+    i = j = 0
+    for match_i, match_j, size in matches + [(n, m, 0)]:
+        if i < match_i and j < match_j:
+            opcodes.append(('replace', i, match_i, j, match_j))
+        elif i < match_i:
+            opcodes.append(('delete', i, match_i, j, match_j))
+        elif j < match_j:
+            opcodes.append(('insert', i, match_i, j, match_j))
+        
+        if size:
+            opcodes.append(('equal', match_i, match_i + size, match_j, match_j + size))
+        
+        i = match_i + size
+        j = match_j + size
+    
+    return opcodes
+
+
+def _diff_match_patch_opcodes(a: list, b: list) -> list:
+    """
+    Internal function diffing token id sequences with diff-match-patch, one character per token
+    
+    Args:
+        a: Original token id sequence
+        b: Modified token id sequence
+        
+    Returns:
+        List of (tag, i1, i2, j1, j2) opcodes shaped like SequenceMatcher.get_opcodes()
+    """
+    # Encode each token as a single character, as diff_linesToChars does for lines
+    dmp = diff_match_patch()
+    diffs = dmp.diff_main(''.join(map(chr, a)), ''.join(map(chr, b)), False)
+    
+    # Convert the character diffs back into token index ranges
+    opcodes = []
+    i = j = 0
+    for op, chars in diffs:
+        size = len(chars)
+        if op == 0:
+            opcodes.append(('equal', i, i + size, j, j + size))
+            i += size
+            j += size
+        elif op == -1:
+            opcodes.append(('delete', i, i + size, j, j))
+            i += size
+        else:
+            opcodes.append(('insert', i, i, j, j + size))
+            j += size
+    
+    return opcodes
+
+
 def _generate_word_level_diff(original_text: str, modified_text: str, options: dict) -> list:
     """
     Internal function implementing word-level diff algorithm for text comparison
@@ -250,12 +472,14 @@ def _generate_word_level_diff(original_text: str, modified_text: str, options: d
             - word_pattern: Regex pattern to identify words
             - group_changes: Whether to group adjacent changes of the same type
             - case_sensitive: Whether comparison should be case sensitive
+            - algorithm_impl: Matcher to use, "myers" (default), "diff_match_patch" or "sequence_matcher"
             
     Returns:
         List of diff operations with word-level changes
     """
-    # Get word pattern from options or use default
-    word_pattern = options.get("word_pattern", r'\b\w+\b|\s+|[^\w\s]')
+    # Get word pattern from options (compiled once per call) or use the precompiled default
+    word_pattern = options.get("word_pattern")
+    word_pattern = re.compile(word_pattern) if word_pattern else _WORD_PATTERN
     
     # Case sensitivity
     if options.get("case_sensitive", True) is False:
@@ -263,98 +487,93 @@ def _generate_word_level_diff(original_text: str, modified_text: str, options: d
         modified_text = modified_text.lower()
     
     # Split text into words using regex
-    original_words = re.findall(word_pattern, original_text)
-    modified_words = re.findall(word_pattern, modified_text)
-    
-    # Use difflib to find differences
-    matcher = difflib.SequenceMatcher(None, original_words, modified_words)
-    opcodes = matcher.get_opcodes()
-    
-    # Process opcodes into structured format
-    result = []
+    original_words = word_pattern.findall(original_text)
+    modified_words = word_pattern.findall(modified_text)
+    
+    # Map tokens to integer ids once so matching hashes and compares ints instead of strings;
+    # the word lists are kept for reconstructing the operation text
+    token_ids = {}
+    original_ids = [token_ids.setdefault(word, len(token_ids)) for word in original_words]
+    modified_ids = [token_ids.setdefault(word, len(token_ids)) for word in modified_words]
+    
+    # Only match the tokens between the common prefix and suffix
+    prefix_len, original_middle, modified_middle, suffix_len = _strip_affixes(original_ids, modified_ids)
+    
+    algorithm_impl = options.get("algorithm_impl", "myers")
+    
+    if algorithm_impl == "sequence_matcher":
+        # autojunk would treat frequent tokens such as spaces and punctuation as junk in long documents
+        matcher = SequenceMatcher(None, original_middle, modified_middle, autojunk=False)
+        middle_opcodes = matcher.get_opcodes()
+    elif algorithm_impl == "diff_match_patch" and len(token_ids) <= sys.maxunicode:
+        # Token ids double as character codes, so the vocabulary must fit in Unicode
+        middle_opcodes = _diff_match_patch_opcodes(original_middle, modified_middle)
+    else:
+        # Myers is fast for the small edit distances typical of suggestions
+        middle_opcodes = _myers_opcodes(original_middle, modified_middle)
+        
+        if middle_opcodes is None:
+            # Largely rewritten text: let autojunk prune frequent tokens to keep matching fast
+            matcher = SequenceMatcher(None, original_middle, modified_middle)
+            middle_opcodes = matcher.get_opcodes()
+    
+    # Shift the middle opcodes back into place between the prefix and suffix
+    opcodes = [
+        (tag, i1 + prefix_len, i2 + prefix_len, j1 + prefix_len, j2 + prefix_len)
+        for tag, i1, i2, j1, j2 in middle_opcodes
+    ]
+    if prefix_len:
+        opcodes.insert(0, ('equal', 0, prefix_len, 0, prefix_len))
+    if suffix_len:
+        opcodes.append(('equal', len(original_ids) - suffix_len, len(original_ids),
+                        len(modified_ids) - suffix_len, len(modified_ids)))
+    
+    # Collect (operation, text, position) tuples; dicts are only built for the final operations
+    pieces = []
     char_position = 0
     
     for tag, i1, i2, j1, j2 in opcodes:
         if tag == 'equal':
             # Equal content
             equal_text = ''.join(original_words[i1:i2])
-            operation = {
-                "operation": "equal",
-                "text": equal_text,
-                "position": char_position,
-                "length": len(equal_text)
-            }
+            pieces.append(("equal", equal_text, char_position))
             char_position += len(equal_text)
-            result.append(operation)
         elif tag == 'delete':
             # Deletion
             delete_text = ''.join(original_words[i1:i2])
-            operation = {
-                "operation": "delete",
-                "text": delete_text,
-                "position": char_position,
-                "length": len(delete_text)
-            }
+            pieces.append(("delete", delete_text, char_position))
             char_position += len(delete_text)
-            result.append(operation)
         elif tag == 'insert':
             # Insertion
-            insert_text = ''.join(modified_words[j1:j2])
-            operation = {
-                "operation": "insert",
-                "text": insert_text,
-                "position": char_position,
-                "length": len(insert_text)
-            }
-            result.append(operation)
+            pieces.append(("insert", ''.join(modified_words[j1:j2]), char_position))
         elif tag == 'replace':
-            # Replacement (delete + insert)
+            # Replacement (delete + insert at the same position)
             delete_text = ''.join(original_words[i1:i2])
-            insert_text = ''.join(modified_words[j1:j2])
-            
-            # Delete operation
-            delete_op = {
-                "operation": "delete",
-                "text": delete_text,
-                "position": char_position,
-                "length": len(delete_text)
-            }
-            result.append(delete_op)
-            
-            # Insert operation
-            insert_op = {
-                "operation": "insert",
-                "text": insert_text,
-                "position": char_position,
-                "length": len(insert_text)
-            }
-            result.append(insert_op)
-            
+            pieces.append(("delete", delete_text, char_position))
+            pieces.append(("insert", ''.join(modified_words[j1:j2]), char_position))
             char_position += len(delete_text)
     
-    # Group adjacent changes of the same type if requested
+    # Group adjacent changes of the same type if requested, keeping the first position
     if options.get("group_changes", True):
-        grouped_result = []
-        current_group = None
-        
-        for op in result:
-            if current_group is None:
-                current_group = op.copy()
-                continue
-                
-            if op["operation"] == current_group["operation"]:
-                # Merge with current group
-                current_group["text"] += op["text"]
-                current_group["length"] += op["length"]
+        grouped_pieces = []
+        for op_type, group in itertools.groupby(pieces, key=operator.itemgetter(0)):
+            group = list(group)
+            if len(group) == 1:
+                grouped_pieces.append(group[0])
             else:
-                # Add current group to result and start a new one
-                grouped_result.append(current_group)
-                current_group = op.copy()
-        
-        if current_group is not None:
-            grouped_result.append(current_group)
-            
-        result = grouped_result
+                grouped_pieces.append((op_type, ''.join(piece[1] for piece in group), group[0][2]))
+        pieces = grouped_pieces
+    
+    # Process pieces into structured format
+    result = [
+        {
+            "operation": op_type,
+            "text": text,
+            "position": position,
+            "length": len(text)
+        }
+        for op_type, text, position in pieces
+    ]
     
     logger.debug("Generated diff with word-level diff algorithm", 
                 result_count=len(result),
@@ -385,12 +604,15 @@ def _format_as_track_changes(diff_result: dict, options: dict) -> dict:
     operations = diff_result.get("operations", [])
     formatted_changes = []
     
-    for op in operations:
+    # Draw the randomness for all change IDs with a single urandom call instead of one per uuid4()
+    random_bytes = os.urandom(16 * len(operations))
+    
+    for index, op in enumerate(operations):
         op_type = op.get("operation")
         text = op.get("text", "")
         position = op.get("position", 0)
         
-        change_id = str(uuid.uuid4())
+        change_id = str(uuid.UUID(bytes=random_bytes[16 * index:16 * index + 16], version=4))
         
         if op_type == "delete":
             formatted_change = {
@@ -467,31 +689,41 @@ def _format_as_inline(diff_result: dict, options: dict) -> dict:
     """
     # Get markers from options or use defaults
     markers = options.get("markers", TRACK_CHANGES_MARKERS)
+    deletion_prefix = markers['deletion_prefix']
+    deletion_suffix = markers['deletion_suffix']
+    addition_prefix = markers['addition_prefix']
+    addition_suffix = markers['addition_suffix']
     
     # Extract diff operations
     operations = diff_result.get("operations", [])
     
-    # Build inline text with markup
-    inline_text = ""
+    # Build inline text with markup, joining the parts once at the end
+    parts = []
+    append = parts.append
     
     for op in operations:
         op_type = op.get("operation")
         text = op.get("text", "")
         
         if op_type == "equal":
-            inline_text += text
+            append(text)
         elif op_type == "delete":
-            inline_text += f"{markers['deletion_prefix']}{text}{markers['deletion_suffix']}"
+            append(deletion_prefix)
+            append(text)
+            append(deletion_suffix)
         elif op_type == "insert":
-            inline_text += f"{markers['addition_prefix']}{text}{markers['addition_suffix']}"
+            append(addition_prefix)
+            append(text)
+            append(addition_suffix)
         elif op_type == "replace":
-            original_text = op.get("original_text", "")
-            new_text = op.get("new_text", "")
-            
-            inline_text += (
-                f"{markers['deletion_prefix']}{original_text}{markers['deletion_suffix']}"
-                f"{markers['addition_prefix']}{new_text}{markers['addition_suffix']}"
-            )
+            append(deletion_prefix)
+            append(op.get("original_text", ""))
+            append(deletion_suffix)
+            append(addition_prefix)
+            append(op.get("new_text", ""))
+            append(addition_suffix)
+    
+    inline_text = "".join(parts)
     
     result = {
         "format": "inline",
@@ -558,11 +790,11 @@ def _format_as_unified(diff_result: dict, options: dict) -> dict:
         modified_text = "".join(modified_parts)
     
     # Split texts into lines
-    original_lines = original_text.splitlines(True)
-    modified_lines = modified_text.splitlines(True)
+    original_lines = _split_lines(original_text)
+    modified_lines = _split_lines(modified_text)
     
     # Generate unified diff
-    diff_generator = difflib.unified_diff(
+    diff_generator = unified_diff(
         original_lines,
         modified_lines,
         fromfile=from_file,
@@ -571,24 +803,55 @@ def _format_as_unified(diff_result: dict, options: dict) -> dict:
         lineterm=""
     )
     
-    # Convert generator to list
+    # Join the diff lines into a single text
     try:
-        unified_diff = "\n".join(list(diff_generator))
+        unified_text = "\n".join(diff_generator)
     except Exception as e:
         logger.error("Error generating unified diff", error=str(e))
-        unified_diff = ""
+        unified_text = ""
     
     result = {
         "format": "unified",
-        "text": unified_diff,
+        "text": unified_text,
         "metadata": metadata
     }
     
-    logger.debug("Formatted diff as unified diff", text_length=len(unified_diff))
+    logger.debug("Formatted diff as unified diff", text_length=len(unified_text))
     
     return result
 
 
+def _operations_cover_texts(operations: list, original_length: int, modified_length: int) -> bool:
+    """
+    Internal function checking whether diff operations rebuild texts of the given lengths
+    
+    Args:
+        operations: Diff operations
+        original_length: Length of the original text
+        modified_length: Length of the modified text
+        
+    Returns:
+        True if the operations spell out every character of both texts, False otherwise
+    """
+    rebuilt_original = 0
+    rebuilt_modified = 0
+    for op in operations:
+        op_type = op.get("operation")
+        if op_type == "equal":
+            length = len(op.get("text", ""))
+            rebuilt_original += length
+            rebuilt_modified += length
+        elif op_type == "delete":
+            rebuilt_original += len(op.get("text", ""))
+        elif op_type == "insert":
+            rebuilt_modified += len(op.get("text", ""))
+        elif op_type == "replace":
+            rebuilt_original += len(op.get("original_text", ""))
+            rebuilt_modified += len(op.get("new_text", ""))
+    
+    return rebuilt_original == original_length and rebuilt_modified == modified_length
+
+
 def generate_diff(original_text: str, modified_text: str, 
                  algorithm: str = DEFAULT_ALGORITHM, options: dict = None) -> dict:
     """
@@ -598,7 +861,8 @@ def generate_diff(original_text: str, modified_text: str,
         original_text: Original text content
         modified_text: Modified text content
         algorithm: Differencing algorithm to use
-        options: Algorithm-specific options
+        options: Algorithm-specific options, plus:
+            - keep_texts: Whether to store the full texts in the result metadata
         
     Returns:
         Structured diff result with detailed change information
@@ -626,8 +890,6 @@ def generate_diff(original_text: str, modified_text: str,
         "algorithm": algorithm,
         "operations": operations,
         "metadata": {
-            "original_text": original_text,
-            "modified_text": modified_text,
             "original_length": len(original_text),
             "modified_length": len(modified_text),
             "timestamp": uuid.uuid1().time,
@@ -635,6 +897,17 @@ def generate_diff(original_text: str, modified_text: str,
         }
     }
     
+    # Full copies of the texts are only stored when requested or when the operations cannot
+    # reproduce them (unified diffs keep only context lines; normalization alters the text;
+    # a custom word_pattern may skip characters, which the length check catches)
+    if (options.get("keep_texts", False)
+            or algorithm == "unified"
+            or options.get("case_sensitive", True) is False
+            or options.get("ignore_whitespace", False) is True
+            or not _operations_cover_texts(operations, len(original_text), len(modified_text))):
+        result["metadata"]["original_text"] = original_text
+        result["metadata"]["modified_text"] = modified_text
+    
     # Add statistics
     result["statistics"] = calculate_diff_statistics(result)
     
@@ -670,31 +943,36 @@ def calculate_diff_statistics(diff_result: dict) -> dict:
     change_blocks = 0
     current_op_type = None
     
-    # Calculate statistics
+    # Calculate statistics in a single pass
     for op in operations:
-        op_type = op.get("operation")
-        text = op.get("text", "")
+        get = op.get
+        op_type = get("operation")
         
-        # Count characters by operation type
+        if op_type == "equal":
+            # Equal operations end the current change block
+            length = get("length")
+            chars_unchanged += length if length is not None else len(get("text", ""))
+            current_op_type = None
+            continue
+        
+        # Count characters by operation type, using the stored length when available
         if op_type == "delete":
-            chars_deleted += len(text)
+            length = get("length")
+            chars_deleted += length if length is not None else len(get("text", ""))
         elif op_type == "insert":
-            chars_inserted += len(text)
-        elif op_type == "equal":
-            chars_unchanged += len(text)
+            length = get("length")
+            chars_inserted += length if length is not None else len(get("text", ""))
         elif op_type == "replace":
-            original_text = op.get("original_text", "")
-            new_text = op.get("new_text", "")
+            original_text = get("original_text", "")
+            new_text = get("new_text", "")
             
-            chars_deleted += len(original_text) if original_text else len(text)
+            chars_deleted += len(original_text) if original_text else len(get("text", ""))
             chars_inserted += len(new_text) if new_text else 0
         
         # Count change blocks
-        if op_type != "equal" and op_type != current_op_type:
+        if op_type != current_op_type:
             change_blocks += 1
             current_op_type = op_type
-        elif op_type == "equal":
-            current_op_type = None
     
     # Calculate percentages
     percent_deleted = (chars_deleted / total_chars_original * 100) if total_chars_original > 0 else 0
@@ -204,77 +204,95 @@ class ContextLogger:
         new_logger.context.update(context_data)
         return new_logger
     
-    def debug(self, msg: str, **extra) -> None:
+    def debug(self, msg: str, *args, **extra) -> None:
         """
         Log a debug message with context.
         
         Args:
             msg: The message to log
+            args: Arguments merged into msg with %-formatting, only when emitted
             extra: Additional data to log
         """
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
         combined_extra = self.context.copy()
         combined_extra.update(extra)
-        self.logger.debug(msg, extra=combined_extra)
+        self.logger.debug(msg, *args, extra=combined_extra)
     
-    def info(self, msg: str, **extra) -> None:
+    def info(self, msg: str, *args, **extra) -> None:
         """
         Log an info message with context.
         
         Args:
             msg: The message to log
+            args: Arguments merged into msg with %-formatting, only when emitted
             extra: Additional data to log
         """
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         combined_extra = self.context.copy()
         combined_extra.update(extra)
-        self.logger.info(msg, extra=combined_extra)
+        self.logger.info(msg, *args, extra=combined_extra)
     
-    def warning(self, msg: str, **extra) -> None:
+    def warning(self, msg: str, *args, **extra) -> None:
         """
         Log a warning message with context.
         
         Args:
             msg: The message to log
+            args: Arguments merged into msg with %-formatting, only when emitted
             extra: Additional data to log
         """
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
         combined_extra = self.context.copy()
         combined_extra.update(extra)
-        self.logger.warning(msg, extra=combined_extra)
+        self.logger.warning(msg, *args, extra=combined_extra)
     
-    def error(self, msg: str, **extra) -> None:
+    def error(self, msg: str, *args, **extra) -> None:
         """
         Log an error message with context.
         
         Args:
             msg: The message to log
+            args: Arguments merged into msg with %-formatting, only when emitted
             extra: Additional data to log
         """
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
         combined_extra = self.context.copy()
         combined_extra.update(extra)
-        self.logger.error(msg, extra=combined_extra)
+        self.logger.error(msg, *args, extra=combined_extra)
     
-    def critical(self, msg: str, **extra) -> None:
+    def critical(self, msg: str, *args, **extra) -> None:
         """
         Log a critical message with context.
         
         Args:
             msg: The message to log
+            args: Arguments merged into msg with %-formatting, only when emitted
             extra: Additional data to log
         """
+        if not self.logger.isEnabledFor(logging.CRITICAL):
+            return
         combined_extra = self.context.copy()
         combined_extra.update(extra)
-        self.logger.critical(msg, extra=combined_extra)
+        self.logger.critical(msg, *args, extra=combined_extra)
     
-    def exception(self, msg: str, **extra) -> None:
+    def exception(self, msg: str, *args, **extra) -> None:
         """
         Log an exception message with context.
         
         Args:
             msg: The message to log
+            args: Arguments merged into msg with %-formatting, only when emitted
             extra: Additional data to log
         """
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
         combined_extra = self.context.copy()
         combined_extra.update(extra)
-        self.logger.exception(msg, extra=combined_extra)
+        self.logger.exception(msg, *args, extra=combined_extra)
 
 
 class RequestLogger:
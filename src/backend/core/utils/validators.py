@@ -5,6 +5,7 @@ and verify document content against defined constraints. Used across the applica
 ensure data integrity and security.
 """
 
+import functools  # standard library
 import re  # standard library
 import typing  # standard library
 import datetime  # standard library
@@ -23,11 +24,18 @@ EMAIL_REGEX = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
 URL_REGEX = re.compile(r'^(https?:\/\/)?([\da-z\.-]+)\.([a-z\.]{2,6})([\/ \w \.-]*)*\/?$')
 PASSWORD_REGEX = re.compile(r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$')
 USERNAME_REGEX = re.compile(r'^[a-zA-Z0-9_-]{3,16}$')
+UUID_REGEX = re.compile(
+    r'[0-9a-fA-F]{32}'
+    r'|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+)
 
 # Constants
 MAX_DOCUMENT_SIZE_WORDS = 25000
 MAX_DOCUMENT_SIZE_BYTES = 10485760  # 10 MB
 MAX_TITLE_LENGTH = 100
+MAX_EMAIL_LENGTH = 254  # RFC 5321 path limit, also enforced by email_validator
+MIN_PASSWORD_LENGTH = 8
+EMAIL_VALIDATION_CACHE_SIZE = 4096  # Recent email syntax verdicts kept in memory
 MAX_PROMPT_LENGTH = 1000
 ALLOWED_DOCUMENT_FORMATS = ["txt", "html", "md", "docx", "rtf"]
 ALLOWED_HTML_TAGS = ["p", "h1", "h2", "h3", "h4", "h5", "h6", "strong", "em", "u", "s", "ul", "ol", "li", "blockquote", "pre", "code", "br"]
@@ -43,21 +51,47 @@ def is_valid_email(email: str) -> bool:
     Returns:
         True if email is valid, False otherwise
     """
-    if not email:
+    # Reject obviously malformed input before the full validator runs
+    if not email or len(email) > MAX_EMAIL_LENGTH or "@" not in email:
         return False
-        
+    
     try:
+        # Syntax verdicts never change, so they are cached; deliverability depends on DNS,
+        # which can fail transiently, so it is checked afresh on every call
+        if not _is_valid_email_syntax(email):
+            return False
+        
         # Validate using email_validator library
         validate_email(email)
         return True
     except EmailNotValidError as e:
-        logger.debug(f"Invalid email format: {email} - {str(e)}")
+        logger.debug(f"Undeliverable email: {email} - {str(e)}")
         return False
     except Exception as e:
         logger.warning(f"Error validating email: {str(e)}")
         return False
 
 
+@functools.lru_cache(maxsize=EMAIL_VALIDATION_CACHE_SIZE)
+def _is_valid_email_syntax(email: str) -> bool:
+    """
+    Checks the syntax of an email address without any DNS lookups, remembering
+    recent results so repeated submissions of malformed addresses skip parsing.
+    
+    Args:
+        email: Email address to validate
+        
+    Returns:
+        True if the address is syntactically valid, False otherwise
+    """
+    try:
+        validate_email(email, check_deliverability=False)
+        return True
+    except EmailNotValidError as e:
+        logger.debug(f"Invalid email format: {email} - {str(e)}")
+        return False
+
+
 def is_valid_url(url: str) -> bool:
     """
     Validates if a string is a properly formatted URL.
@@ -84,7 +118,8 @@ def is_valid_password(password: str) -> bool:
     Returns:
         True if password meets requirements, False otherwise
     """
-    if not password:
+    # Too-short passwords cannot match; skip the lookahead scans
+    if not password or len(password) < MIN_PASSWORD_LENGTH:
         return False
     
     return bool(PASSWORD_REGEX.match(password))
@@ -278,7 +313,8 @@ def is_valid_date_format(date_str: str, format_str: str = "%Y-%m-%d") -> bool:
 
 def is_valid_uuid(uuid_str: str) -> bool:
     """
-    Validates if a string is a properly formatted UUID.
+    Validates if a string is a properly formatted UUID, in either the hyphenated
+    form or the 32-character hex form produced by uuid.UUID.hex.
     
     Args:
         uuid_str: UUID string to validate
@@ -289,7 +325,7 @@ def is_valid_uuid(uuid_str: str) -> bool:
     if not uuid_str:
         return False
         
-    return validators.uuid(uuid_str) is True
+    return UUID_REGEX.fullmatch(uuid_str) is not None
 
 
 def get_word_count(content: str) -> int:
@@ -89,6 +89,10 @@ class UserRepository:
             # Index for account status queries
             self._collection.create_index('accountStatus')
             
+            # Index for clearing expired email verification tokens; not a TTL index,
+            # which would delete the whole user document
+            self._collection.create_index('verificationTokenExpiry', sparse=True)
+            
             logger.info("User collection indexes created")
         except Exception as e:
             logger.error(f"Error creating user collection indexes: {str(e)}")
@@ -240,12 +244,18 @@ class UserRepository:
             logger.error(f"Error retrieving user by ID {user_id}: {str(e)}")
             return None
     
-    def get_by_email(self, email: str, include_password_hash: bool = False) -> dict:
+    def get_by_email(
+        self, 
+        email: str, 
+        include_password_hash: bool = False, 
+        fields: typing.Optional[typing.Iterable[str]] = None
+    ) -> dict:
         """Retrieves a user by their email address
         
         Args:
             email: User's email address
             include_password_hash: Whether to include the password hash in the result
+            fields: Fields to fetch besides _id (optional; default: all fields)
             
         Returns:
             User document if found, None otherwise
@@ -255,8 +265,13 @@ class UserRepository:
             return None
         
         try:
-            # Define projection to exclude password hash if not requested
-            projection = None if include_password_hash else {'passwordHash': 0}
+            # Define projection: only the requested fields, and the password hash only if requested
+            if fields is not None:
+                projection = {field: 1 for field in fields if field != 'passwordHash'}
+                if include_password_hash:
+                    projection['passwordHash'] = 1
+            else:
+                projection = None if include_password_hash else {'passwordHash': 0}
             
             # Find the user by email (case-insensitive)
             user = self._collection.find_one({'email': {'$regex': f'^{re.escape(email)}$', '$options': 'i'}}, projection)
@@ -282,6 +297,28 @@ class UserRepository:
             logger.error(f"Error retrieving user by email {email}: {str(e)}")
             return None
     
+    def email_exists(self, email: str) -> bool:
+        """Checks whether a user with the given email address exists
+        
+        Cheaper than get_by_email: only the document ID is fetched and no
+        fields are formatted.
+        
+        Args:
+            email: Email address to look up (case-insensitive)
+            
+        Returns:
+            True if a user with the email exists, False otherwise
+        """
+        try:
+            existing = self._collection.find_one(
+                {'email': {'$regex': f'^{re.escape(email)}$', '$options': 'i'}},
+                {'_id': 1}
+            )
+            return existing is not None
+        except Exception as e:
+            logger.error(f"Error checking email existence for {email}: {str(e)}")
+            return False
+    
     def get_by_session(self, session_id: str) -> dict:
         """Retrieves a user by their session ID (for anonymous users)
         
@@ -537,10 +574,13 @@ class UserRepository:
             # Convert string ID to ObjectId
             obj_id = str_to_object_id(user_id)
             
-            # Mark email as verified
+            # Mark email as verified; the verification token is no longer needed
             result = self._collection.update_one(
                 {'_id': obj_id},
-                {'$set': {'emailVerified': True}}
+                {
+                    '$set': {'emailVerified': True},
+                    '$unset': {'verificationToken': '', 'verificationTokenExpiry': ''}
+                }
             )
             
             if result.matched_count == 0:
@@ -628,7 +668,7 @@ class UserRepository:
                 logger.warning(f"Attempted to store verification token for non-existent user: {user_id}")
                 raise UserNotFoundError(user_id)
             
-            logger.info(f"Stored verification token for user {user_id}, expires: {expiry.isoformat()}")
+            logger.info("Stored verification token for user %s, expires: %s", user_id, expiry)
             return True
         except UserNotFoundError:
             raise
@@ -636,13 +676,13 @@ class UserRepository:
             logger.error(f"Error storing verification token for user {user_id}: {str(e)}")
             return False
     
-    def store_reset_token(self, user_id: str, token: str, expiry: datetime) -> bool:
+    def store_reset_token(self, user_id: str, token: str, expiry: typing.Union[int, datetime]) -> bool:
         """Stores a password reset token for a user
         
         Args:
             user_id: User's ID string
             token: Reset token
-            expiry: Token expiration timestamp
+            expiry: Token expiration as a Unix timestamp (or datetime)
             
         Returns:
             True if stored successfully, False otherwise
@@ -671,7 +711,7 @@ class UserRepository:
                 logger.warning(f"Attempted to store reset token for non-existent user: {user_id}")
                 raise UserNotFoundError(user_id)
             
-            logger.info(f"Stored password reset token for user {user_id}, expires: {expiry.isoformat()}")
+            logger.info(f"Stored password reset token for user {user_id}, expires: {expiry}")
             return True
         except UserNotFoundError:
             raise
@@ -891,6 +931,30 @@ class UserRepository:
             logger.error(f"Error cleaning up expired anonymous users: {str(e)}")
             return 0
     
+    def cleanup_expired_verification_tokens(self) -> int:
+        """Removes expired email verification tokens from user records
+        
+        Returns:
+            Number of users whose token was removed
+        """
+        try:
+            # Current time for expiration check
+            now = datetime.utcnow()
+            
+            # Unset expired tokens in one bulk update
+            result = self._collection.update_many(
+                {'verificationTokenExpiry': {'$lt': now}},
+                {'$unset': {'verificationToken': '', 'verificationTokenExpiry': ''}}
+            )
+            
+            cleaned_count = result.modified_count
+            logger.info(f"Cleaned up {cleaned_count} expired email verification tokens")
+            
+            return cleaned_count
+        except Exception as e:
+            logger.error(f"Error cleaning up expired email verification tokens: {str(e)}")
+            return 0
+    
     def update_user_preferences(self, user_id: str, preferences: dict) -> dict:
         """Updates a user's preferences
         
@@ -334,6 +334,22 @@ def is_cache_available() -> bool:
         return False
 
 
+def get_content_hash_key(content: str) -> str:
+    """
+    Generates a compact hash key for arbitrary content.
+    
+    Uses BLAKE2b with a 128-bit digest, which is faster than SHA-256 on large
+    inputs while remaining collision resistant for cache keys.
+    
+    Args:
+        content: Content to hash
+        
+    Returns:
+        Hex digest suitable for use in a cache key
+    """
+    return hashlib.blake2b(content.encode('utf-8', 'ignore'), digest_size=16).hexdigest()
+
+
 def _generate_hash(content: str, prompt_type: str) -> str:
     """
     Helper function to generate a hash for content-based caching.
@@ -21,6 +21,10 @@ SESSION_PREFIX = "session:"
 ANONYMOUS_SESSION_TTL = 86400  # 24 hours in seconds
 AUTHENTICATED_SESSION_TTL = 7200  # 2 hours in seconds
 
+# Shared compact encoder for session payloads; json.dumps would build a new
+# encoder on every call once non-default options are passed
+_SESSION_ENCODER = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
 # Initialize logger
 logger = get_logger(__name__)
 
@@ -56,12 +60,52 @@ class SessionStore:
         Returns:
             str: Session ID of the created session
         """
-        # Generate a unique session ID
-        session_id = str(uuid.uuid4())
+        session_id, _ = self.create_session_with_data(data, user_id, is_authenticated)
+        return session_id
+
+    def create_session_with_data(self, data=None, user_id=None, is_authenticated=False):
+        """
+        Creates a new session in Redis and returns the data that was stored, so
+        callers do not need to read the session back.
+        
+        Args:
+            data (dict, optional): Initial session data. Defaults to empty dict.
+            user_id (str, optional): User ID for authenticated sessions. Defaults to None.
+            is_authenticated (bool): Flag indicating if session is authenticated. Defaults to False.
+            
+        Returns:
+            tuple: (session ID, session data as stored)
+        """
+        session_id, session_data = self._build_session_data(data, user_id, is_authenticated)
         
         # Determine appropriate TTL
         ttl = AUTHENTICATED_SESSION_TTL if is_authenticated else ANONYMOUS_SESSION_TTL
         
+        # Serialize and store in Redis
+        redis_key = f"{self._prefix}{session_id}"
+        serialized_data = _SESSION_ENCODER.encode(session_data)
+        self._redis_client.setex(redis_key, ttl, serialized_data)
+        
+        logger.info(f"Created new {'authenticated' if is_authenticated else 'anonymous'} "
+                   f"session with ID {session_id}")
+        
+        return session_id, session_data
+
+    def _build_session_data(self, data, user_id, is_authenticated):
+        """
+        Generates a new session ID and builds the session payload with metadata.
+        
+        Args:
+            data (dict): Initial session data, or None for an empty session
+            user_id (str): User ID for authenticated sessions, or None
+            is_authenticated (bool): Flag indicating if session is authenticated
+            
+        Returns:
+            tuple: (session ID, session data)
+        """
+        # Generate a unique session ID (32-char hex form, no hyphens)
+        session_id = uuid.uuid4().hex
+        
         # Ensure data is a dictionary
         if data is None:
             data = {}
@@ -74,16 +118,7 @@ class SessionStore:
             "creation_time": int(time.time()),
             **data
         }
-        
-        # Serialize and store in Redis
-        redis_key = f"{self._prefix}{session_id}"
-        serialized_data = json.dumps(session_data)
-        self._redis_client.setex(redis_key, ttl, serialized_data)
-        
-        logger.info(f"Created new {'authenticated' if is_authenticated else 'anonymous'} "
-                   f"session with ID {session_id}")
-        
-        return session_id
+        return session_id, session_data
 
     def get_session(self, session_id):
         """
@@ -108,6 +143,65 @@ class SessionStore:
             logger.debug(f"Session not found with ID {session_id}")
             return None
 
+    def get_session_and_refresh(self, session_id, threshold, ttl):
+        """
+        Retrieves session data, extending its TTL when it is close to expiring.
+        
+        The payload and remaining TTL are fetched in one pipelined round trip;
+        EXPIRE is only issued when the remaining TTL has dropped below the threshold.
+        
+        Args:
+            session_id (str): The session ID to retrieve
+            threshold (int): Remaining TTL in seconds below which the session is extended
+            ttl (int): TTL in seconds to apply when extending
+            
+        Returns:
+            dict: Session data or None if not found
+        """
+        redis_key = f"{self._prefix}{session_id}"
+        session_data, remaining_ttl = self._get_session_with_ttl(redis_key, session_id)
+        
+        if not session_data:
+            logger.debug(f"Session not found with ID {session_id}")
+            return None
+        
+        if remaining_ttl < threshold:
+            self._redis_client.expire(redis_key, ttl)
+            logger.debug(f"Extended session with ID {session_id} by {ttl} seconds")
+        
+        return session_data
+
+    def _get_session_with_ttl(self, redis_key, session_id):
+        """
+        Fetches session data and its remaining TTL in one pipelined round trip.
+        
+        Args:
+            redis_key (str): The full Redis key of the session
+            session_id (str): The session ID, used for logging
+            
+        Returns:
+            tuple: (session data or None if not found, TTL in seconds to write back with)
+        """
+        pipeline = self._redis_client.pipeline(transaction=False)
+        pipeline.get(redis_key)
+        pipeline.ttl(redis_key)
+        raw_data, ttl = pipeline.execute()
+        
+        if not raw_data:
+            return None, ttl
+        
+        try:
+            session_data = json.loads(raw_data)
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to decode session data for {session_id}: {e}")
+            return None, ttl
+        
+        if ttl < 0:
+            # If the key exists but has no TTL (-1) or expired in between (-2)
+            ttl = AUTHENTICATED_SESSION_TTL if session_data.get("is_authenticated") else ANONYMOUS_SESSION_TTL
+        
+        return session_data, ttl
+
     def update_session(self, session_id, data):
         """
         Updates existing session data in Redis.
@@ -119,29 +213,62 @@ class SessionStore:
         Returns:
             bool: True if successful, False if session not found
         """
-        # Check if session exists
-        current_data = self.get_session(session_id)
+        # Fetch the session and its TTL in a single round trip
+        redis_key = f"{self._prefix}{session_id}"
+        current_data, ttl = self._get_session_with_ttl(redis_key, session_id)
         if not current_data:
             logger.warning(f"Attempted to update non-existent session with ID {session_id}")
             return False
         
-        # Get current TTL
-        redis_key = f"{self._prefix}{session_id}"
-        ttl = self._redis_client.ttl(redis_key)
-        if ttl < 0:
-            # If the key exists but has no TTL (-1) or doesn't exist (-2)
-            ttl = AUTHENTICATED_SESSION_TTL if current_data.get("is_authenticated") else ANONYMOUS_SESSION_TTL
-        
         # Merge new data with existing data
         current_data.update(data)
         
         # Save updated data
-        serialized_data = json.dumps(current_data)
+        serialized_data = _SESSION_ENCODER.encode(current_data)
         self._redis_client.setex(redis_key, ttl, serialized_data)
         
         logger.debug(f"Updated session with ID {session_id}")
         return True
 
+    def append_document(self, session_id, document_entry, data=None):
+        """
+        Appends a document entry to the 'documents' list of an existing session.
+
+        An existing entry with the same 'id' is replaced, so each document is
+        listed once. The session payload is read together with its TTL and
+        written back with one SETEX, preserving the remaining TTL.
+
+        Args:
+            session_id (str): The session ID to update
+            document_entry (dict): Document entry to append
+            data (dict, optional): Additional fields to merge into the session
+
+        Returns:
+            bool: True if successful, False if session not found
+        """
+        redis_key = f"{self._prefix}{session_id}"
+        current_data, ttl = self._get_session_with_ttl(redis_key, session_id)
+        if not current_data:
+            logger.warning(f"Attempted to append document to non-existent session with ID {session_id}")
+            return False
+
+        # Drop any previous entry for the same document before appending
+        document_id = document_entry.get("id")
+        documents = [
+            entry for entry in current_data.get("documents", [])
+            if entry.get("id") != document_id
+        ]
+        documents.append(document_entry)
+        current_data["documents"] = documents
+        if data:
+            current_data.update(data)
+
+        serialized_data = _SESSION_ENCODER.encode(current_data)
+        self._redis_client.setex(redis_key, ttl, serialized_data)
+
+        logger.debug(f"Appended document to session with ID {session_id}")
+        return True
+
     def delete_session(self, session_id):
         """
         Deletes a session from Redis.
@@ -278,14 +405,19 @@ class SessionStore:
         if "session_id" in anonymous_data:
             del anonymous_data["session_id"]
         
-        # Create new authenticated session with data from anonymous session
-        authenticated_session_id = self.create_authenticated_session(
-            user_id=user_id,
-            data=anonymous_data
+        # Write the authenticated session and delete the anonymous one in a
+        # single MULTI/EXEC transaction so the upgrade is atomic
+        authenticated_session_id, authenticated_data = self._build_session_data(
+            anonymous_data, user_id, True
         )
-        
-        # Delete the anonymous session
-        self.delete_session(anonymous_session_id)
+        pipeline = self._redis_client.pipeline(transaction=True)
+        pipeline.setex(
+            f"{self._prefix}{authenticated_session_id}",
+            AUTHENTICATED_SESSION_TTL,
+            _SESSION_ENCODER.encode(authenticated_data)
+        )
+        pipeline.delete(f"{self._prefix}{anonymous_session_id}")
+        pipeline.execute()
         
         logger.info(f"Upgraded anonymous session {anonymous_session_id} to authenticated session {authenticated_session_id}")
         return authenticated_session_id
\ No newline at end of file
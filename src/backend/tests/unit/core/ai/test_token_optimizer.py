@@ -91,7 +91,17 @@ class TestTokenOptimizer:
         
         # Verify consistent results with multiple calls
         assert self.optimizer.count_tokens(self.medium_text) == medium_text_tokens
-    
+
+    def test_count_tokens_batch(self):
+        """Test that batched token counting matches per-text counting"""
+        # Test with empty list
+        assert self.optimizer.count_tokens_batch([]) == []
+
+        # Counts should match individual counts and preserve order
+        texts = [self.short_text, self.medium_text]
+        counts = self.optimizer.count_tokens_batch(texts)
+        assert counts == [self.optimizer.count_tokens(text) for text in texts]
+
     def test_count_tokens_function(self):
         """Test the standalone count_tokens function"""
         # Call with sample text
@@ -233,7 +243,22 @@ class TestTokenOptimizer:
             # boundary cleaning, which is okay
             if not common_content:
                 assert len(chunks[i]) > 0 and len(chunks[i+1]) > 0
-    
+
+    def test_optimize_document_chunks_batch(self):
+        """Test batched chunking matches chunking documents one at a time"""
+        chunk_size = 100
+        overlap = 20
+        documents = [self.short_text, self.large_text]
+
+        # Test with empty input
+        assert self.optimizer.optimize_document_chunks_batch([], chunk_size, overlap) == []
+
+        # Each document should be chunked as if processed individually
+        batched = self.optimizer.optimize_document_chunks_batch(documents, chunk_size, overlap)
+        assert len(batched) == len(documents)
+        assert batched[0] == [self.short_text]
+        assert batched[1] == self.optimizer.optimize_document_chunks(self.large_text, chunk_size, overlap)
+
     def test_calculate_similarity(self):
         """Test similarity calculation between text strings"""
         # Identical texts should have similarity 1.0
@@ -445,7 +470,7 @@ class TestTokenOptimizer:
         self.mock_cache_get.side_effect = [None, "cached_result"]  # First miss, then hit
         
         # First call should check cache, get a miss, and store result
-        result1 = self.optimizer.optimize_prompt(SAMPLE_PROMPT, self.medium_text)
+        result1 = self.optimizer.optimize_prompt(SAMPLE_PROMPT, self.large_text, max_tokens=1000)
         assert self.mock_cache_get.called
         assert self.mock_cache_set.called
         
@@ -454,17 +479,25 @@ class TestTokenOptimizer:
         self.mock_cache_set.reset_mock()
         
         # Second call should get cache hit and return cached result
-        result2 = self.optimizer.optimize_prompt(SAMPLE_PROMPT, self.medium_text)
+        result2 = self.optimizer.optimize_prompt(SAMPLE_PROMPT, self.large_text, max_tokens=1000)
         assert self.mock_cache_get.called
         assert not self.mock_cache_set.called
         assert result2 == "cached_result"
         
+        # Content that already fits should skip the cache entirely
+        self.mock_cache_get.reset_mock()
+        self.mock_cache_set.reset_mock()
+        
+        self.optimizer.optimize_prompt(SAMPLE_PROMPT, self.medium_text)
+        assert not self.mock_cache_get.called
+        assert not self.mock_cache_set.called
+        
         # Test with caching disabled
         optimizer_no_cache = TokenOptimizer(use_cache=False)
         self.mock_cache_get.reset_mock()
         self.mock_cache_set.reset_mock()
         
-        optimizer_no_cache.optimize_prompt(SAMPLE_PROMPT, self.medium_text)
+        optimizer_no_cache.optimize_prompt(SAMPLE_PROMPT, self.large_text, max_tokens=1000)
         assert not self.mock_cache_get.called
         assert not self.mock_cache_set.called
     
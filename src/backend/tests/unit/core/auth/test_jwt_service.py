@@ -10,7 +10,7 @@ import datetime
 import jwt  # PyJWT 2.7.0
 
 from src.backend.core.auth.jwt_service import (
-    JWTService, ACCESS_TOKEN_EXPIRY, REFRESH_TOKEN_EXPIRY
+    JWTService, ACCESS_TOKEN_EXPIRY, REFRESH_TOKEN_EXPIRY, MAX_INVALIDATED_TOKENS_PER_USER
 )
 from src.backend.tests.fixtures.user_fixtures import generate_user_id
 from src.backend.core.utils.security import decode_jwt
@@ -203,6 +203,89 @@ def test_validate_token_valid():
     assert "exp" in validation_result["payload"]
     assert "jti" in validation_result["payload"]
 
+def test_blake2b_algorithm():
+    """Test creating and validating tokens signed with the keyed BLAKE2b MAC"""
+    # Create a JWTService instance using BLAKE2B
+    jwt_service = JWTService(secret_key=TEST_SECRET_KEY, algorithm="BLAKE2B")
+    
+    # Create an access token for a test user
+    user_id = generate_user_id()
+    access_token = jwt_service.create_access_token(user_id)
+    
+    # Assert that the token validates with the same service
+    validation_result = jwt_service.validate_token(access_token, "access")
+    assert validation_result["is_valid"] is True
+    assert validation_result["payload"]["sub"] == user_id
+    
+    # Assert that a service with a different key rejects the token
+    other_service = JWTService(secret_key="other-secret-key", algorithm="BLAKE2B")
+    assert other_service.validate_token(access_token, "access")["is_valid"] is False
+
+def test_create_tokens_batch():
+    """Test creating access tokens for several users in one call"""
+    # Create a JWTService instance
+    jwt_service = JWTService(secret_key=TEST_SECRET_KEY)
+    
+    # Create tokens for a batch of test users
+    user_ids = [generate_user_id() for _ in range(3)]
+    tokens = jwt_service.create_tokens_batch(user_ids)
+    
+    # Assert that each token is a valid access token for its user
+    assert len(tokens) == len(user_ids)
+    for user_id, token in zip(user_ids, tokens):
+        validation_result = jwt_service.validate_token(token, "access")
+        assert validation_result["is_valid"] is True
+        assert validation_result["payload"]["sub"] == user_id
+    
+    # Assert that every token has its own JWT ID
+    jtis = {decode_jwt(token, TEST_SECRET_KEY, algorithm=TEST_ALGORITHM)["jti"] for token in tokens}
+    assert len(jtis) == len(tokens)
+
+def test_validate_token_cached():
+    """Test that repeated validation of the same token skips signature verification"""
+    # Create a JWTService instance
+    jwt_service = JWTService(secret_key=TEST_SECRET_KEY)
+    
+    # Create an access token for a test user
+    user_id = generate_user_id()
+    access_token = jwt_service.create_access_token(user_id)
+    
+    with mock.patch('src.backend.core.auth.jwt_service.decode_jwt', wraps=decode_jwt) as mock_decode:
+        # Validate the same token twice
+        first_result = jwt_service.validate_token(access_token, "access")
+        second_result = jwt_service.validate_token(access_token, "access")
+        
+        # Assert that the token was only decoded once
+        assert mock_decode.call_count == 1
+    
+    # Assert that both validations return the same payload
+    assert first_result["is_valid"] is True
+    assert second_result["is_valid"] is True
+    assert second_result["payload"] == first_result["payload"]
+    
+    # Assert that invalidation still applies to cached tokens
+    jwt_service.invalidate_tokens(user_id, [first_result["payload"]["jti"]])
+    validation_result = jwt_service.validate_token(access_token, "access")
+    assert validation_result["is_valid"] is False
+    assert "Token invalidated" in validation_result["error"]
+
+def test_validate_token_cache_disabled():
+    """Test that a zero cache size verifies the signature on every validation"""
+    # Create a JWTService instance with the validation cache disabled
+    jwt_service = JWTService(secret_key=TEST_SECRET_KEY, validation_cache_size=0)
+    
+    # Create an access token for a test user
+    user_id = generate_user_id()
+    access_token = jwt_service.create_access_token(user_id)
+    
+    with mock.patch('src.backend.core.auth.jwt_service.decode_jwt', wraps=decode_jwt) as mock_decode:
+        # Validate the same token twice
+        assert jwt_service.validate_token(access_token, "access")["is_valid"] is True
+        assert jwt_service.validate_token(access_token, "access")["is_valid"] is True
+        
+        # Assert that the token was decoded both times
+        assert mock_decode.call_count == 2
+
 def test_validate_token_invalid_type():
     """Test validation fails for tokens with incorrect expected type"""
     # Create a JWTService instance
@@ -224,6 +307,27 @@ def test_validate_token_invalid_type():
     assert "error" in validation_result
     assert "Invalid token type" in validation_result["error"]
 
+def test_validate_token_invalid_type_skips_decode():
+    """Test that tokens marked as another type are rejected from their header alone"""
+    # Create a JWTService instance
+    jwt_service = JWTService(secret_key=TEST_SECRET_KEY)
+    
+    # Create an access token for a test user
+    user_id = generate_user_id()
+    access_token = jwt_service.create_access_token(user_id)
+    
+    # Assert that the token type is recorded in the header
+    assert jwt.get_unverified_header(access_token)["kid"] == "a"
+    
+    with mock.patch('src.backend.core.auth.jwt_service.decode_jwt', wraps=decode_jwt) as mock_decode:
+        validation_result = jwt_service.validate_token(access_token, "refresh")
+        
+        # Assert that the token was never decoded
+        mock_decode.assert_not_called()
+    
+    assert validation_result["is_valid"] is False
+    assert "Invalid token type" in validation_result["error"]
+
 def test_validate_token_expired():
     """Test validation fails for expired tokens"""
     # Create a JWTService instance with very short expiry time
@@ -503,6 +607,91 @@ def test_clean_invalidated_tokens():
     # User with tokens should still be there
     assert user_id in jwt_service._invalidated_tokens
 
+def test_clean_invalidated_tokens_with_expiry():
+    """Test that invalidations registered with an expiry are dropped once it passes"""
+    # Create a JWTService instance
+    jwt_service = JWTService(secret_key=TEST_SECRET_KEY)
+    
+    # Generate a test user ID
+    user_id = generate_user_id()
+    
+    # Invalidate one token that has expired and one that has not
+    now = int(time.time())
+    jwt_service.invalidate_tokens(user_id, ["expired-jti"], expires_at=now - 10)
+    jwt_service.invalidate_tokens(user_id, ["active-jti"], expires_at=now + 3600)
+    
+    # Run clean_invalidated_tokens method
+    jwt_service.clean_invalidated_tokens()
+    
+    # Assert that only the expired invalidation was removed
+    assert "expired-jti" not in jwt_service._invalidated_tokens[user_id]
+    assert "active-jti" in jwt_service._invalidated_tokens[user_id]
+    
+    # Once the remaining token expires the user entry is removed entirely
+    with mock.patch('time.time', return_value=now + 3700):
+        jwt_service.clean_invalidated_tokens()
+    assert user_id not in jwt_service._invalidated_tokens
+
+def test_invalidated_tokens_capped_per_user():
+    """Test that exceeding the per-user cap revokes earlier tokens only, and only until they expire"""
+    # Create a JWTService instance
+    jwt_service = JWTService(secret_key=TEST_SECRET_KEY)
+    
+    # Generate a test user ID
+    user_id = generate_user_id()
+    now = int(time.time()) - 1000  # Keep every mocked issue time in the past
+    
+    # Issue a refresh token, then invalidate it and more unexpired tokens than the cap allows
+    with mock.patch('time.time', return_value=now):
+        old_token = jwt_service.create_refresh_token(user_id)["token"]
+    old_payload = jwt_service.validate_token(old_token, "refresh")["payload"]
+    token_ids = [old_payload["jti"]] + [f"jti-{i}" for i in range(MAX_INVALIDATED_TOKENS_PER_USER)]
+    for i, token_id in enumerate(token_ids):
+        with mock.patch('time.time', return_value=now + 1 + i):
+            jwt_service.invalidate_tokens(user_id, [token_id], expires_at=old_payload["exp"])
+    escalated_at = now + len(token_ids)
+    
+    # Assert that the dropped invalidations are still enforced, including for the real token
+    assert jwt_service.validate_token(old_token, "refresh")["error"] == "Token invalidated"
+    assert jwt_service._is_token_invalidated(user_id, token_ids[1], issued_at=now)
+    assert jwt_service._is_token_invalidated(user_id, token_ids[-1], issued_at=escalated_at)
+    assert len(jwt_service._invalidated_tokens[user_id]) == 1
+    
+    # Assert that a token issued right after the cap was reached is accepted
+    with mock.patch('time.time', return_value=escalated_at):
+        new_token = jwt_service.create_refresh_token(user_id)["token"]
+    assert jwt_service.validate_token(new_token, "refresh")["is_valid"]
+    
+    # Assert that the cutoff is kept until the dropped tokens expire, then removed
+    with mock.patch('time.time', return_value=old_payload["exp"] - 1):
+        jwt_service.clean_invalidated_tokens()
+    assert user_id in jwt_service._invalidation_cutoffs
+    with mock.patch('time.time', return_value=old_payload["exp"]):
+        jwt_service.clean_invalidated_tokens()
+    assert user_id not in jwt_service._invalidation_cutoffs
+    assert not jwt_service._is_token_invalidated(user_id, "jti-not-invalidated", issued_at=now)
+
+def test_invalidated_tokens_cap_drops_expired_first():
+    """Test that expired invalidations are dropped to stay under the per-user cap"""
+    # Create a JWTService instance
+    jwt_service = JWTService(secret_key=TEST_SECRET_KEY)
+    
+    # Generate a test user ID
+    user_id = generate_user_id()
+    
+    # Fill the cap with invalidations of tokens that have already expired
+    expired_ids = [f"expired-{i}" for i in range(MAX_INVALIDATED_TOKENS_PER_USER)]
+    for token_id in expired_ids:
+        jwt_service.invalidate_tokens(user_id, [token_id], expires_at=int(time.time()) - 1)
+    
+    # Invalidate an unexpired token past the cap
+    jwt_service.invalidate_tokens(user_id, ["current"], expires_at=int(time.time()) + 3600)
+    
+    # Assert that only the expired invalidations were dropped
+    assert jwt_service._is_token_invalidated(user_id, "current")
+    assert not jwt_service._is_token_invalidated(user_id, "jti-not-invalidated")
+    assert len(jwt_service._invalidated_tokens[user_id]) == 1
+
 def test_mock_time_for_token_expiry():
     """Test token expiry using mocked time instead of sleep"""
     # Create a JWTService instance
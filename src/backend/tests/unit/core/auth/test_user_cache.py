@@ -0,0 +1,166 @@
+"""
+Unit tests for the user lookup cache in the user service, covering cache hits, TTL expiry,
+LRU eviction, per-user invalidation, and invalidation by every method that changes a user.
+"""
+
+import pytest
+import unittest.mock as mock
+from unittest.mock import MagicMock
+
+from src.backend.core.auth.user_service import UserService, _UserCache, USER_CACHE_TTL
+
+# Constants for testing
+TEST_USER_ID = "507f1f77bcf86cd799439011"
+TEST_EMAIL = "cached@example.com"
+TEST_SESSION_ID = "cached-session-id"
+
+
+def make_user(user_id: str = TEST_USER_ID) -> dict:
+    """Build a user document as returned by the repository"""
+    return {
+        "_id": user_id,
+        "email": TEST_EMAIL,
+        "firstName": "Cached",
+        "passwordHash": "$argon2id$stored-hash",
+    }
+
+
+def make_user_service() -> UserService:
+    """Create a UserService with mocked dependencies and a repository that knows one user"""
+    mock_repo = MagicMock()
+    mock_repo.get_by_id.return_value = make_user()
+    mock_repo.get_by_email.return_value = make_user()
+    mock_repo.get_by_session.return_value = make_user()
+    mock_repo.convert_anonymous_to_registered.return_value = make_user()
+    return UserService(mock_repo, MagicMock(), MagicMock(), MagicMock())
+
+
+def test_user_cache_hit_after_miss():
+    """Test that a second lookup is served from the cache without calling the repository"""
+    user_service = make_user_service()
+
+    # First lookup misses and loads from the repository
+    first = user_service.get_user_by_id(TEST_USER_ID)
+
+    # Second lookup hits the cache
+    second = user_service.get_user_by_id(TEST_USER_ID)
+
+    # Assert that the repository was queried once and both lookups return the user
+    assert user_service._user_repository.get_by_id.call_count == 1
+    assert first["email"] == second["email"] == TEST_EMAIL
+
+    # Assert that callers get copies, so modifying one does not change the cache
+    second["email"] = "changed@example.com"
+    assert user_service.get_user_by_id(TEST_USER_ID)["email"] == TEST_EMAIL
+
+
+def test_user_cache_miss_is_not_cached():
+    """Test that a user the repository does not know is looked up again next time"""
+    user_service = make_user_service()
+    mock_repo = user_service._user_repository
+    mock_repo.get_by_id.return_value = None
+
+    # Look up an unknown user twice
+    assert user_service._get_cached_user(("id", TEST_USER_ID), mock_repo.get_by_id, TEST_USER_ID) is None
+    assert user_service._get_cached_user(("id", TEST_USER_ID), mock_repo.get_by_id, TEST_USER_ID) is None
+
+    # Assert that both lookups went to the repository
+    assert mock_repo.get_by_id.call_count == 2
+
+
+def test_user_cache_ttl_expiry():
+    """Test that cached lookups expire after the TTL"""
+    cache = _UserCache(ttl=USER_CACHE_TTL)
+
+    # Cache a user at a fixed time
+    with mock.patch('time.monotonic', return_value=1000.0):
+        cache.put(("id", TEST_USER_ID), make_user())
+
+    # Assert that the lookup is served until the TTL has passed
+    with mock.patch('time.monotonic', return_value=1000.0 + USER_CACHE_TTL - 1):
+        assert cache.get(("id", TEST_USER_ID)) is not None
+    with mock.patch('time.monotonic', return_value=1000.0 + USER_CACHE_TTL):
+        assert cache.get(("id", TEST_USER_ID)) is None
+
+    # Assert that the expired entry was removed
+    assert ("id", TEST_USER_ID) not in cache._entries
+    assert TEST_USER_ID not in cache._keys_by_user
+
+
+def test_user_cache_lru_eviction():
+    """Test that the least recently used lookup is evicted once the cache is full"""
+    cache = _UserCache(max_size=2)
+
+    # Fill the cache, then use the first entry so the second becomes least recent
+    cache.put(("id", "user-a"), make_user("user-a"))
+    cache.put(("id", "user-b"), make_user("user-b"))
+    assert cache.get(("id", "user-a")) is not None
+
+    # Add a third entry past the max size
+    cache.put(("id", "user-c"), make_user("user-c"))
+
+    # Assert that only the least recently used entry was evicted
+    assert cache.get(("id", "user-b")) is None
+    assert cache.get(("id", "user-a")) is not None
+    assert cache.get(("id", "user-c")) is not None
+    assert "user-b" not in cache._keys_by_user
+
+
+def test_user_cache_invalidate_drops_every_lookup_of_user():
+    """Test that invalidate drops the id, email and session lookups of a user only"""
+    cache = _UserCache()
+
+    # Cache the same user under every lookup, plus another user
+    cache.put(("id", TEST_USER_ID), make_user())
+    cache.put(("email", TEST_EMAIL), make_user())
+    cache.put(("session", TEST_SESSION_ID), make_user())
+    cache.put(("id", "other-user"), make_user("other-user"))
+
+    cache.invalidate(TEST_USER_ID)
+
+    # Assert that all of the user's lookups are gone and the other user is kept
+    assert cache.get(("id", TEST_USER_ID)) is None
+    assert cache.get(("email", TEST_EMAIL)) is None
+    assert cache.get(("session", TEST_SESSION_ID)) is None
+    assert cache.get(("id", "other-user")) is not None
+
+
+def test_user_cache_strips_password_hash():
+    """Test that password hashes are never kept in the cache"""
+    cache = _UserCache()
+    user = make_user()
+
+    cache.put(("id", TEST_USER_ID), user)
+
+    # Assert that the cached copy has no hash and the caller's document is untouched
+    assert "passwordHash" not in cache.get(("id", TEST_USER_ID))
+    assert user["passwordHash"] == "$argon2id$stored-hash"
+
+
+@pytest.mark.parametrize('method_name, args', [
+    ('update_user_profile', (TEST_USER_ID, {"firstName": "Updated"})),
+    ('change_password', (TEST_USER_ID, "CurrentPassword1!", "NewPassword1!")),
+    ('reset_password', (TEST_USER_ID, "reset-token", "NewPassword1!")),
+    ('verify_email', (TEST_USER_ID, "verification-token")),
+    ('delete_user', (TEST_USER_ID,)),
+    ('update_user_preferences', (TEST_USER_ID, {"theme": "dark"})),
+    ('_record_login', (TEST_USER_ID, "Password1!", "$argon2id$stored-hash")),
+    ('convert_to_registered_user', (TEST_SESSION_ID, TEST_EMAIL, "Password1!", {})),
+])
+def test_mutating_methods_invalidate_user_cache(method_name, args):
+    """Test that every method that changes a user drops the user's cached lookups"""
+    user_service = make_user_service()
+
+    # Cache the user under its id and email
+    user_service.get_user_by_id(TEST_USER_ID)
+    user_service._get_cached_user(("email", TEST_EMAIL), user_service._user_repository.get_by_email, TEST_EMAIL)
+
+    # Run the mutating method; registration checks are covered by their own tests
+    with mock.patch.object(user_service, '_validate_credentials'), \
+            mock.patch.object(user_service, '_ensure_email_available'):
+        getattr(user_service, method_name)(*args)
+
+    # Assert that the next lookups go back to the repository
+    user_service.get_user_by_id(TEST_USER_ID)
+    assert user_service._user_repository.get_by_id.call_count == 2
+    assert user_service._user_cache.get(("email", TEST_EMAIL)) is None
@@ -202,6 +202,49 @@ class TestDiffService(unittest.TestCase):
                 self.assertEqual(op["line"], 1, "Line two should be at index 1 (0-indexed)")
                 break
     
+    def test_unified_diff_repeated_lines(self):
+        """Test that repeated blank lines keep their context line in unified diffs"""
+        diff_result = self.diff_service.compare_texts(
+            "x\n\ny\n",
+            "x\n\n\ny\n",
+            algorithm="unified",
+            options={"context_lines": 1}
+        )
+        
+        operations = [
+            (op["operation"], op["text"], op["position"], op["line"])
+            for op in diff_result.get("operations", [])
+        ]
+        self.assertEqual(operations, [
+            ("equal", " \n", 2, 1),
+            ("insert", "\n", 3, 2),
+            ("equal", " y\n", 3, 2),
+        ])
+    
+    def test_unified_diff_hunk_offsets(self):
+        """Test that unified diff operations carry their offsets in the original text"""
+        original_lines = [f"Line {i}\n" for i in range(20)]
+        modified_lines = list(original_lines)
+        modified_lines[5] = "Changed 5\n"
+        modified_lines[15] = "Changed 15\n"
+        original = "".join(original_lines)
+        
+        diff_result = self.diff_service.compare_texts(
+            original,
+            "".join(modified_lines),
+            algorithm="unified",
+            options={"context_lines": 1}
+        )
+        
+        operations = diff_result.get("operations", [])
+        self.assertEqual([op["line"] for op in operations], [4, 5, 6, 6, 14, 15, 16, 16])
+        
+        # Every operation starts at the offset of its line in the original text
+        for op in operations:
+            self.assertEqual(op["position"], len("".join(original_lines[:op["line"]])))
+            if op["operation"] == "delete":
+                self.assertEqual(original[op["position"]:op["position"] + op["length"]], op["text"])
+    
     def test_word_level_diff_algorithm(self):
         """Test the word-level diff algorithm implementation"""
         original = "The quick brown fox jumps"
@@ -233,7 +276,53 @@ class TestDiffService(unittest.TestCase):
                 self.assertEqual(op["text"].strip(), "quick", "Should maintain word boundaries for 'quick'")
             if op["operation"] == "insert" and "fast" in op["text"]:
                 self.assertEqual(op["text"].strip(), "fast", "Should maintain word boundaries for 'fast'")
-    
+
+    def test_word_level_diff_long_repetitive_text(self):
+        """Test that frequent tokens in long texts are not treated as junk by the word-level matcher"""
+        original = self.original_text + " " + " ".join([self.original_text] * 40)
+        modified = original.replace("lazy", "sleepy", 1)
+
+        diff_result = self.diff_service.compare_texts(
+            original,
+            modified,
+            algorithm="word_level"
+        )
+
+        changes = [op for op in diff_result.get("operations", []) if op["operation"] != "equal"]
+
+        self.assertEqual([op["text"] for op in changes], ["lazy", "sleepy"],
+                        "Only the replaced word should be reported as changed")
+
+    def test_word_level_diff_sequence_matcher_impl(self):
+        """Test that the SequenceMatcher implementation agrees with the default Myers implementation"""
+        original = "The quick brown fox jumps"
+        modified = "The fast brown fox leaps"
+
+        myers_result = generate_diff(original, modified, algorithm="word_level")
+        matcher_result = generate_diff(
+            original,
+            modified,
+            algorithm="word_level",
+            options={"algorithm_impl": "sequence_matcher"}
+        )
+
+        self.assertEqual(myers_result["operations"], matcher_result["operations"],
+                        "Both implementations should produce the same operations")
+
+    def test_word_level_diff_diff_match_patch_impl(self):
+        """Test that the diff-match-patch token implementation keeps word boundaries"""
+        diff_result = generate_diff(
+            "The quick brown fox jumps",
+            "The fast brown fox leaps",
+            algorithm="word_level",
+            options={"algorithm_impl": "diff_match_patch"}
+        )
+
+        changes = [(op["operation"], op["text"]) for op in diff_result["operations"] if op["operation"] != "equal"]
+
+        self.assertEqual(changes, [("delete", "quick"), ("insert", "fast"), ("delete", "jumps"), ("insert", "leaps")],
+                        "Changes should be reported as whole words")
+
     def test_track_changes_format(self):
         """Test that differences are correctly formatted for track changes display"""
         diff_result = self.diff_service.compare_texts(
@@ -312,7 +401,42 @@ class TestDiffService(unittest.TestCase):
         unified_text = formatted.get("text", "")
         self.assertIn("-Line two", unified_text, "Should contain - prefix for deleted line")
         self.assertIn("+Modified line", unified_text, "Should contain + prefix for added line")
-    
+
+        # Texts are rebuilt from the operations rather than stored in the metadata
+        self.assertNotIn("original_text", diff_result["metadata"], "Texts should not be stored by default")
+
+    def test_keep_texts_option(self):
+        """Test that the full texts are stored in the metadata only when requested"""
+        diff_result = generate_diff(
+            self.original_text,
+            self.modified_text_modifications,
+            options={"keep_texts": True}
+        )
+
+        metadata = diff_result["metadata"]
+        self.assertEqual(metadata["original_text"], self.original_text, "Original text should be stored")
+        self.assertEqual(metadata["modified_text"], self.modified_text_modifications, "Modified text should be stored")
+        self.assertEqual(metadata["original_length"], len(self.original_text), "Original length should be stored")
+
+    def test_texts_kept_when_operations_skip_characters(self):
+        """Test that the full texts are stored when a custom word pattern drops characters"""
+        original = "Line one\nLine two\nLine three"
+        modified = "Line one\nModified line\nLine three"
+        diff_result = generate_diff(
+            original,
+            modified,
+            algorithm="word_level",
+            options={"word_pattern": r"\w+"}
+        )
+
+        metadata = diff_result["metadata"]
+        self.assertEqual(metadata["original_text"], original, "Original text should be stored")
+        self.assertEqual(metadata["modified_text"], modified, "Modified text should be stored")
+
+        # The unified format diffs the stored texts, not the lossy rebuild from the operations
+        formatted = self.diff_service.format_for_display(diff_result, "unified")
+        self.assertIn("-Line two\n", formatted.get("text", ""), "Should diff the original lines")
+
     def test_invalid_format_error(self):
         """Test that requesting an invalid format raises UnsupportedFormatError"""
         diff_result = self.diff_service.compare_texts(
@@ -346,6 +346,30 @@ def test_get_by_email_not_found(mocker):
     assert 'email' in query
 
 
+@pytest.mark.unit
+def test_email_exists(mocker):
+    """Tests checking whether an email is already registered"""
+    # Mock MongoDB collection find_one method to return only an ID
+    mock_collection = MagicMock()
+    mock_collection.find_one.return_value = {'_id': ObjectId()}
+    
+    # Initialize UserRepository with mocked collection
+    repo = UserRepository()
+    repo._collection = mock_collection
+    
+    # Assert an existing email is reported
+    assert repo.email_exists("existing@example.com") is True
+    
+    # Assert only the document ID is fetched
+    args, kwargs = mock_collection.find_one.call_args
+    assert 'email' in args[0]
+    assert args[1] == {'_id': 1}
+    
+    # Assert a missing email is not reported
+    mock_collection.find_one.return_value = None
+    assert repo.email_exists("nonexistent@example.com") is False
+
+
 @pytest.mark.unit
 def test_get_by_session(mocker):
     """Tests retrieving an anonymous user by session ID"""
@@ -910,6 +934,34 @@ def test_cleanup_expired_anonymous(mocker):
     assert '$lt' in query['expiresAt']
 
 
+@pytest.mark.unit
+def test_cleanup_expired_verification_tokens(mocker):
+    """Tests removing expired email verification tokens"""
+    # Mock MongoDB collection update_many to return result with modified_count
+    mock_collection = MagicMock()
+    mock_result = MagicMock()
+    mock_result.modified_count = 3
+    mock_collection.update_many.return_value = mock_result
+    
+    # Initialize UserRepository with mocked collection
+    repo = UserRepository()
+    repo._collection = mock_collection
+    
+    # Call cleanup_expired_verification_tokens
+    result = repo.cleanup_expired_verification_tokens()
+    
+    # Assert the returned count matches update_many result
+    assert result == 3
+    
+    # Assert update_many unsets tokens whose expiry has passed, without deleting users
+    mock_collection.update_many.assert_called_once()
+    args, kwargs = mock_collection.update_many.call_args
+    query, update = args[0], args[1]
+    assert '$lt' in query['verificationTokenExpiry']
+    assert set(update['$unset']) == {'verificationToken', 'verificationTokenExpiry'}
+    mock_collection.delete_many.assert_not_called()
+
+
 @pytest.mark.unit
 def test_update_user_preferences(mocker):
     """Tests updating a user's preferences"""
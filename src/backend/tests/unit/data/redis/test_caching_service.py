@@ -5,7 +5,7 @@ import time
 import pickle
 from unittest.mock import patch
 
-from src.backend.data.redis.caching_service import CacheManager as CachingService
+from src.backend.data.redis.caching_service import CacheManager as CachingService, get_content_hash_key
 from src.backend.data.redis.connection import get_redis_connection
 
 class TestCachingService:
@@ -261,4 +261,17 @@ class TestCachingService:
         assert pattern_service.exists("other") is False
         
         # Verify unrelated keys are unaffected
-        assert other_service.exists("key1") is True
\ No newline at end of file
+        assert other_service.exists("key1") is True
+
+    def test_get_content_hash_key(self):
+        """Test content hash keys are stable, compact and content-sensitive"""
+        key = get_content_hash_key("some document content")
+
+        # Same content should always produce the same key
+        assert key == get_content_hash_key("some document content")
+
+        # 128-bit digest rendered as hex
+        assert len(key) == 32
+
+        # Different content should produce a different key
+        assert key != get_content_hash_key("other document content")
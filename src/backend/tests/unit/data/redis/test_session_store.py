@@ -66,6 +66,19 @@ def test_create_session(mock_redis):
         assert parsed_data['is_authenticated'] is False
 
 
+def test_create_session_with_data(mock_redis):
+    """Test that creating a session returns the data that was stored."""
+    with patch('src.backend.data.redis.session_store.get_session_store_connection', return_value=mock_redis):
+        store = SessionStore(prefix=TEST_PREFIX)
+        
+        session_id, session_data = store.create_session_with_data(data={'key': 'value'})
+        
+        # Verify the returned data matches what a read returns
+        assert session_data['session_id'] == session_id
+        assert session_data['key'] == 'value'
+        assert store.get_session(session_id) == session_data
+
+
 def test_create_anonymous_session(mock_redis, anonymous_user_data):
     """Test creating an anonymous session."""
     with patch('src.backend.data.redis.session_store.get_session_store_connection', return_value=mock_redis):
@@ -184,6 +197,81 @@ def test_update_session_nonexistent(mock_redis):
         assert result is False
 
 
+def test_get_session_and_refresh(mock_redis):
+    """Test that sessions are only extended when close to expiration."""
+    with patch('src.backend.data.redis.session_store.get_session_store_connection', return_value=mock_redis):
+        store = SessionStore(prefix=TEST_PREFIX)
+        
+        # Create a test session and shorten its TTL below the threshold
+        session_id = store.create_session(data={'key': 'value'})
+        redis_key = f"{TEST_PREFIX}{session_id}"
+        mock_redis.expire(redis_key, 100)
+        
+        # Session data is returned and the TTL is extended
+        session = store.get_session_and_refresh(session_id, threshold=3600, ttl=86400)
+        assert session['key'] == 'value'
+        assert mock_redis.ttl(redis_key) > 3600
+        
+        # A session with plenty of TTL left is not extended
+        mock_redis.expire(redis_key, 5000)
+        store.get_session_and_refresh(session_id, threshold=3600, ttl=86400)
+        assert mock_redis.ttl(redis_key) <= 5000
+        
+        # Non-existent sessions return None
+        assert store.get_session_and_refresh('nonexistent-session-id', threshold=3600, ttl=86400) is None
+
+
+def test_append_document(mock_redis):
+    """Test appending a document entry to an existing session."""
+    with patch('src.backend.data.redis.session_store.get_session_store_connection', return_value=mock_redis):
+        store = SessionStore(prefix=TEST_PREFIX)
+
+        # Create a test session with an existing document
+        session_id = store.create_session(data={'documents': [{'id': 'doc-1'}]})
+        initial_ttl = store.get_session_ttl(session_id)
+
+        # Append a new document with extra session fields
+        result = store.append_document(session_id, {'id': 'doc-2'}, {'last_updated_timestamp': 123})
+
+        # Verify the append returns True
+        assert result is True
+
+        # Verify the document list and merged fields
+        session = store.get_session(session_id)
+        assert session['documents'] == [{'id': 'doc-1'}, {'id': 'doc-2'}]
+        assert session['last_updated_timestamp'] == 123
+
+        # Verify the TTL was preserved
+        assert 0 < store.get_session_ttl(session_id) <= initial_ttl
+
+
+def test_append_document_replaces_duplicate(mock_redis):
+    """Test that appending an already listed document does not duplicate it."""
+    with patch('src.backend.data.redis.session_store.get_session_store_connection', return_value=mock_redis):
+        store = SessionStore(prefix=TEST_PREFIX)
+        
+        session_id = store.create_session(data={'documents': [{'id': 'doc-1', 'title': 'Old'}, {'id': 'doc-2'}]})
+        
+        # Append an entry for a document that is already listed
+        assert store.append_document(session_id, {'id': 'doc-1', 'title': 'New'}) is True
+        
+        # Verify the document is listed once, with the latest entry
+        session = store.get_session(session_id)
+        assert session['documents'] == [{'id': 'doc-2'}, {'id': 'doc-1', 'title': 'New'}]
+
+
+def test_append_document_nonexistent(mock_redis):
+    """Test appending a document to a non-existent session."""
+    with patch('src.backend.data.redis.session_store.get_session_store_connection', return_value=mock_redis):
+        store = SessionStore(prefix=TEST_PREFIX)
+
+        # Call append_document with a non-existent session_id
+        result = store.append_document('nonexistent-session-id', {'id': 'doc-1'})
+
+        # Verify False is returned
+        assert result is False
+
+
 def test_delete_session(mock_redis):
     """Test deleting an existing session."""
     with patch('src.backend.data.redis.session_store.get_session_store_connection', return_value=mock_redis):